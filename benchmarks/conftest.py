@@ -0,0 +1,93 @@
+"""
+Benchmarks of every query path against the in-memory fakes.
+
+    DJANBLE_BENCHMARK_ROWS=1000,100000,1000000 python -m pytest benchmarks
+
+``DJANBLE_BENCHMARK_ROWS`` lists the table sizes (default 1000),
+``DJANBLE_BENCHMARK_LATENCY`` the seconds slept per request (default 0) and
+``DJANBLE_BENCHMARK_JSON`` a file the results are written to.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+
+ROW_COUNTS = [int(rows) for rows in os.environ.get("DJANBLE_BENCHMARK_ROWS", "1000").split(",")]
+LATENCY = float(os.environ.get("DJANBLE_BENCHMARK_LATENCY", "0"))
+
+results = []
+
+
+@pytest.fixture(scope="session")
+def latency() -> float:
+    return LATENCY
+
+
+@pytest.fixture(scope="module", params=ROW_COUNTS, ids=lambda rows: f"{rows}rows")
+def rows(request) -> int:
+    return request.param
+
+
+@pytest.fixture
+def benchmark(request, rows):
+    """
+    ``benchmark(service, operation)`` calls ``operation(0)`` to warm up,
+    ``operation(1)`` timed and ``operation(2)`` under tracemalloc, so writes can
+    pick distinct rows per call. ``operation`` returns the number of rows it
+    processed.
+    """
+
+    def run(service, operation) -> dict:
+        operation(0)
+        service.requests.clear()
+        started = time.perf_counter()
+        processed = operation(1) or 1
+        elapsed = time.perf_counter() - started
+        round_trips = dict(service.requests)
+
+        tracemalloc.start()
+        try:
+            operation(2)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        variant = [str(value) for name, value in request.node.callspec.params.items() if name != "rows"]
+        record = {
+            "name": request.node.originalname + (f"[{'-'.join(variant)}]" if variant else ""),
+            "module": request.module.__name__.rsplit(".", 1)[-1],
+            "rows": rows,
+            "processed": processed,
+            "seconds": elapsed,
+            "throughput": processed / elapsed if elapsed else float("inf"),
+            "round_trips": sum(round_trips.values()),
+            "requests": round_trips,
+            "peak_memory": peak,
+        }
+        results.append(record)
+        return record
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not results:
+        return
+
+    terminalreporter.section("djanble benchmarks")
+    terminalreporter.line(
+        f"{'benchmark':<45} {'rows':>9} {'processed':>9} {'rows/s':>12} {'round trips':>11} {'peak KiB':>10}"
+    )
+    for record in results:
+        terminalreporter.line(
+            f"{record['module'] + '::' + record['name']:<45} {record['rows']:>9} {record['processed']:>9} "
+            f"{record['throughput']:>12.0f} {record['round_trips']:>11} {record['peak_memory'] / 1024:>10.0f}"
+        )
+
+    json_path = os.environ.get("DJANBLE_BENCHMARK_JSON")
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,167 @@
+"""
+Selects on DynamoDB are sent as PartiQL scans that read every page, and
+updates other than by id are not supported, so there are no index, bulk or
+filtered update paths to measure here.
+"""
+
+import math
+
+import pytest
+
+from djanble.dynamodb.fake import FakeDynamoDB
+
+TABLE = "bench_item"
+CATEGORIES = 100
+BATCH_SIZE = 100
+PAGE_SIZE = 1000
+
+
+def scan_pages(rows: int) -> int:
+    return max(math.ceil(rows / PAGE_SIZE), 1)
+
+
+def placeholders(count: int) -> str:
+    return ", ".join(["%s"] * count)
+
+
+@pytest.fixture(scope="module")
+def service(rows, latency):
+    service = FakeDynamoDB(latency=latency, page_size=PAGE_SIZE)
+    service.create_table(TABLE)
+    service.load(
+        TABLE, ((pk, {"name": f"item {pk}", "category": pk % CATEGORIES, "score": pk}) for pk in range(1, rows + 1))
+    )
+    return service
+
+
+@pytest.fixture
+def cursor(service):
+    return service.connect().cursor()
+
+
+def test_point_get(service, cursor, benchmark, rows):
+    def operation(attempt):
+        cursor.execute(
+            f'SELECT "{TABLE}"."id", "{TABLE}"."name" FROM "{TABLE}" WHERE "{TABLE}"."id" = %s', (1 + attempt,)
+        )
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["processed"] == 1
+    assert record["requests"] == {"ExecuteStatement": scan_pages(rows)}
+
+
+def test_batch_get(service, cursor, benchmark, rows):
+    def operation(attempt):
+        pks = list(range(1 + attempt * BATCH_SIZE, 1 + (attempt + 1) * BATCH_SIZE))
+        cursor.execute(
+            f'SELECT "{TABLE}"."id", "{TABLE}"."name" FROM "{TABLE}" WHERE "{TABLE}"."id" IN ({placeholders(len(pks))})',
+            tuple(pks),
+        )
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["processed"] == BATCH_SIZE
+    assert record["requests"] == {"ExecuteStatement": scan_pages(rows)}
+
+
+def test_range_scan(service, cursor, benchmark, rows):
+    def operation(attempt):
+        cursor.execute(f'SELECT "{TABLE}"."id", "{TABLE}"."name", "{TABLE}"."score" FROM "{TABLE}"', ())
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["processed"] == rows
+    assert record["requests"] == {"ExecuteStatement": scan_pages(rows)}
+
+
+def test_filtered_select(service, cursor, benchmark, rows):
+    def operation(attempt):
+        cursor.execute(
+            f'SELECT "{TABLE}"."id", "{TABLE}"."name" FROM "{TABLE}" WHERE "{TABLE}"."category" = %s', (attempt,)
+        )
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["processed"] == len(range(1, rows + 1, CATEGORIES))
+    assert record["requests"] == {"ExecuteStatement": scan_pages(rows)}
+
+
+def test_export(service, benchmark, rows):
+    conn = service.connect()
+
+    def operation(attempt):
+        return sum(len(chunk["id"]) for chunk in conn.export(TABLE, ["id", "name", "category", "score"]))
+
+    record = benchmark(service, operation)
+    assert record["processed"] == rows
+    assert record["requests"] == {"ExecuteStatement": math.ceil(rows / PAGE_SIZE)}
+
+
+def test_insert(service, cursor, benchmark):
+    def operation(attempt):
+        cursor.execute(
+            f'INSERT INTO "{TABLE}" ("name", "category", "score") VALUES (%s, %s, %s)', ("inserted", attempt, 0)
+        )
+        return 1
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"ExecuteStatement": 1}
+
+
+@pytest.mark.parametrize("write_behind", [True, "atomic"])
+def test_bulk_insert(service, benchmark, write_behind):
+    """``bulk_create`` sends one INSERT per object because bulk inserts are not supported."""
+    conn = service.connect(write_behind=write_behind)
+    cursor = conn.cursor()
+
+    def operation(attempt):
+        conn.autocommit = False
+        for i in range(BATCH_SIZE):
+            cursor.execute(
+                f'INSERT INTO "{TABLE}" ("name", "category", "score") VALUES (%s, %s, %s)', ("bulk", attempt, i)
+            )
+        conn.commit()
+        conn.autocommit = True
+        return BATCH_SIZE
+
+    record = benchmark(service, operation)
+    if write_behind == "atomic":
+        assert record["requests"] == {"ExecuteTransaction": 1}
+    else:
+        assert record["requests"] == {"BatchExecuteStatement": math.ceil(BATCH_SIZE / service.batch_statements_limit)}
+
+
+def test_update(service, cursor, benchmark):
+    def operation(attempt):
+        cursor.execute(f'UPDATE "{TABLE}" SET "score" = %s WHERE "{TABLE}"."id" = %s', (-1, 1 + attempt))
+        return 1
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"ExecuteStatement": 1}
+
+
+def test_write_behind_update(service, benchmark):
+    conn = service.connect(write_behind=True)
+    cursor = conn.cursor()
+
+    def operation(attempt):
+        conn.autocommit = False
+        for pk in range(1 + attempt * BATCH_SIZE, 1 + (attempt + 1) * BATCH_SIZE):
+            cursor.execute(f'UPDATE "{TABLE}" SET "score" = %s WHERE "{TABLE}"."id" = %s', (0, pk))
+        conn.commit()
+        conn.autocommit = True
+        return BATCH_SIZE
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"BatchExecuteStatement": math.ceil(BATCH_SIZE / service.batch_statements_limit)}
+
+
+def test_delete(service, cursor, benchmark, rows):
+    def operation(attempt):
+        pks = list(range(rows - (attempt + 1) * BATCH_SIZE + 1, rows - attempt * BATCH_SIZE + 1))
+        cursor.execute(f'DELETE FROM "{TABLE}" WHERE "{TABLE}"."id" IN ({placeholders(len(pks))})', tuple(pks))
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"ExecuteStatement": BATCH_SIZE}
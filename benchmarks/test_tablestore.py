@@ -0,0 +1,191 @@
+import math
+
+import pytest
+
+from djanble.tablestore.fake import FakeTablestore
+
+TABLE = "bench_item"
+CATEGORIES = 100
+BATCH_SIZE = 100
+PAGE_SIZE = 5000
+
+
+def placeholders(count: int) -> str:
+    return ", ".join(["%s"] * count)
+
+
+@pytest.fixture(scope="module")
+def service(rows, latency):
+    service = FakeTablestore(latency=latency, page_size=PAGE_SIZE)
+    service.create_table(TABLE, [("name", "STRING"), ("category", "INTEGER"), ("score", "INTEGER")])
+    service.create_index(TABLE, "category")
+    service.load(
+        TABLE, ((pk, {"name": f"item {pk}", "category": pk % CATEGORIES, "score": pk}) for pk in range(1, rows + 1))
+    )
+    return service
+
+
+@pytest.fixture
+def cursor(service):
+    return service.connect().cursor()
+
+
+def test_point_get(service, cursor, benchmark, rows):
+    def operation(attempt):
+        cursor.execute(
+            f'SELECT "{TABLE}"."id", "{TABLE}"."name" FROM "{TABLE}" WHERE "{TABLE}"."id" = %s', [rows // 2 + attempt]
+        )
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"GetRow": 1}
+
+
+def test_batch_get(service, cursor, benchmark, rows):
+    def operation(attempt):
+        pks = list(range(1 + attempt, rows + 1, max(rows // BATCH_SIZE, 1)))[:BATCH_SIZE]
+        cursor.execute(
+            f'SELECT "{TABLE}"."id", "{TABLE}"."name" FROM "{TABLE}" WHERE "{TABLE}"."id" IN ({placeholders(len(pks))})',
+            pks,
+        )
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"BatchGetRow": 1}
+
+
+def test_range_scan(service, cursor, benchmark, rows):
+    def operation(attempt):
+        cursor.execute(f'SELECT "{TABLE}"."id", "{TABLE}"."name", "{TABLE}"."score" FROM "{TABLE}"', [])
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["processed"] == rows
+    assert record["requests"] == {"GetRange": math.ceil(rows / PAGE_SIZE)}
+
+
+def test_filtered_select(service, cursor, benchmark, rows):
+    def operation(attempt):
+        cursor.execute(
+            f'SELECT "{TABLE}"."id", "{TABLE}"."name" FROM "{TABLE}" WHERE "{TABLE}"."category" = %s', [attempt]
+        )
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    matched = len(range(1, rows + 1, CATEGORIES))
+    assert record["processed"] == matched
+    assert record["requests"] == {"GetRange": max(math.ceil(matched / PAGE_SIZE), 1)}
+
+
+def test_sqlite_fallback(service, cursor, benchmark, rows):
+    def operation(attempt):
+        cursor.execute(f'SELECT COUNT(*) FROM "{TABLE}" WHERE "{TABLE}"."score" > %s', [attempt])
+        return rows
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"DescribeTable": 1, "GetRange": math.ceil(rows / PAGE_SIZE)}
+
+
+def test_export(service, benchmark, rows):
+    conn = service.connect()
+
+    def operation(attempt):
+        return sum(len(chunk["id"]) for chunk in conn.export(TABLE, ["id", "name", "category", "score"]))
+
+    record = benchmark(service, operation)
+    assert record["processed"] == rows
+    assert record["requests"] == {"DescribeTable": 1, "GetRange": math.ceil(rows / PAGE_SIZE)}
+
+
+def test_insert(service, cursor, benchmark):
+    def operation(attempt):
+        cursor.execute(
+            f'INSERT INTO "{TABLE}" ("name", "category", "score") VALUES (%s, %s, %s)', ["inserted", attempt, 0]
+        )
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"PutRow": 1}
+
+
+def test_bulk_insert(service, benchmark):
+    """``bulk_create`` sends one INSERT per object because bulk inserts are not supported."""
+    conn = service.connect(write_behind=True)
+    cursor = conn.cursor()
+
+    def operation(attempt):
+        conn.autocommit = False
+        for i in range(BATCH_SIZE):
+            cursor.execute(
+                f'INSERT INTO "{TABLE}" ("name", "category", "score") VALUES (%s, %s, %s)', ["bulk", attempt, i]
+            )
+        conn.commit()
+        conn.autocommit = True
+        return BATCH_SIZE
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"PutRow": BATCH_SIZE}
+
+
+def test_update(service, cursor, benchmark):
+    def operation(attempt):
+        cursor.execute(f'UPDATE "{TABLE}" SET "score" = %s WHERE "{TABLE}"."id" = %s', [-1, 1 + attempt])
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"BatchWriteRow": 1}
+
+
+def test_bulk_update(service, cursor, benchmark):
+    def operation(attempt):
+        pks = list(range(1 + attempt * BATCH_SIZE, 1 + (attempt + 1) * BATCH_SIZE))
+        whens = " ".join(f'WHEN ("{TABLE}"."id" = %s) THEN %s' for _ in pks)
+        cursor.execute(
+            f'UPDATE "{TABLE}" SET "score" = CASE {whens} ELSE NULL END '
+            f'WHERE "{TABLE}"."id" IN ({placeholders(len(pks))})',
+            [param for pk in pks for param in (pk, -pk)] + pks,
+        )
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    assert record["processed"] == BATCH_SIZE
+    assert record["requests"] == {"BatchWriteRow": 1}
+
+
+def test_filtered_update(service, cursor, benchmark, rows):
+    def operation(attempt):
+        cursor.execute(f'UPDATE "{TABLE}" SET "name" = %s WHERE "{TABLE}"."category" = %s', ["updated", attempt])
+        return cursor.rowcount
+
+    record = benchmark(service, operation)
+    matched = record["processed"]
+    assert record["requests"] == {
+        "GetRange": max(math.ceil(matched / PAGE_SIZE), 1),
+        "BatchWriteRow": math.ceil(matched / service.batch_write_row_limit),
+    }
+
+
+def test_write_behind_update(service, benchmark):
+    conn = service.connect(write_behind=True)
+    cursor = conn.cursor()
+
+    def operation(attempt):
+        conn.autocommit = False
+        for pk in range(1 + attempt * BATCH_SIZE, 1 + (attempt + 1) * BATCH_SIZE):
+            cursor.execute(f'UPDATE "{TABLE}" SET "score" = %s WHERE "{TABLE}"."id" = %s', [0, pk])
+        conn.commit()
+        conn.autocommit = True
+        return BATCH_SIZE
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"BatchWriteRow": 1}
+
+
+def test_delete(service, cursor, benchmark, rows):
+    def operation(attempt):
+        pks = list(range(rows - (attempt + 1) * BATCH_SIZE + 1, rows - attempt * BATCH_SIZE + 1))
+        cursor.execute(f'DELETE FROM "{TABLE}" WHERE "{TABLE}"."id" IN ({placeholders(len(pks))})', pks)
+        return len(pks)
+
+    record = benchmark(service, operation)
+    assert record["requests"] == {"DeleteRow": BATCH_SIZE}
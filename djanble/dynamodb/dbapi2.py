@@ -1,8 +1,14 @@
 import datetime
 import importlib
 import re
+import time
 
 import boto3
+from boto3.dynamodb.types import TypeDeserializer
+
+from ..export import ColumnBuffers
+from ..instrumentation import QueryStats
+from .transaction import WriteBuffer
 
 Date = datetime.date
 
@@ -12,6 +18,9 @@ Timestamp = datetime.datetime
 
 Binary = memoryview
 
+TRANSACT_STATEMENTS_LIMIT = 100
+BATCH_STATEMENTS_LIMIT = 25
+
 # Exceptions
 class Error(Exception):
     pass
@@ -43,6 +52,18 @@ class Cursor:
         return [(column, None, None, None, None, None, None) for column in self._description_columns]
 
     def execute(self, sql: str, params=None):
+        self.stats = self.conn.stats = QueryStats(sql, params)
+        try:
+            self._execute(sql, params)
+        finally:
+            self.conn.stats = None
+            self.stats.finish()
+
+    def _execute(self, sql: str, params=None):
+        if self.conn.write_buffer and sql.split()[0].lower() == "select":
+            # Reads must see the writes buffered so far
+            self.conn.flush()
+
         select_match = re.match("\s*SELECT\s+(?P<columns>.*?)\s+FROM", sql, re.IGNORECASE)
         self._description_columns = []
         if isinstance(select_match, re.Match):
@@ -64,11 +85,22 @@ class Cursor:
         except ModuleNotFoundError:
             pass
 
-        result = self.conn.client.execute_statement(Statement=sql % params)["Items"]
+        self.conn.stats.access_path = "partiql"
+        response = self.conn.client.execute_statement(Statement=sql % params)
+        result = response["Items"]
+        while "NextToken" in response:
+            response = self.conn.client.execute_statement(Statement=sql % params, NextToken=response["NextToken"])
+            result.extend(response["Items"])
 
         if self._description_columns:
-            result = [tuple(list(row[column].values())[0] for column in self._description_columns) for row in result]
+            with self.stats.measure_decode():
+                # NULL attributes are left out of items
+                result = [
+                    tuple(_from_attribute_value(row.get(column)) for column in self._description_columns)
+                    for row in result
+                ]
             self.rowcount = len(result)
+            self.stats.rows_returned = self.rowcount
 
         self.result = iter(result)
 
@@ -91,21 +123,151 @@ class Cursor:
         pass
 
 
+def _capacity_units(parsed: dict) -> dict:
+    consumed = parsed.get("ConsumedCapacity") or []
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+
+    read_capacity = write_capacity = 0
+    for capacity in consumed:
+        if "ReadCapacityUnits" in capacity or "WriteCapacityUnits" in capacity:
+            read_capacity += capacity.get("ReadCapacityUnits", 0)
+            write_capacity += capacity.get("WriteCapacityUnits", 0)
+        elif "Items" in parsed:
+            read_capacity += capacity.get("CapacityUnits", 0)
+        else:
+            write_capacity += capacity.get("CapacityUnits", 0)
+    return {"read_capacity": read_capacity, "write_capacity": write_capacity}
+
+
+_deserializer = TypeDeserializer()
+
+
+def _from_attribute_value(value):
+    if value is None:
+        return None
+    if "S" in value:
+        return value["S"]
+    if "N" in value:
+        number = value["N"]
+        return int(number) if number.lstrip("-").isdigit() else float(number)
+    if "NULL" in value:
+        return None
+    return _deserializer.deserialize(value)
+
+
 class Connection:
-    def __init__(self, host: str, user, password, db):
-        host_match = re.match(r"^dynamodb\.(?P<region>.*)\.amazonaws\.com$", host, re.IGNORECASE)
-        assert host_match, host
-        region_name = host_match.groupdict()["region"]
-        self.client = boto3.client(
-            "dynamodb",
-            region_name=region_name,
-            aws_access_key_id=user,
-            aws_secret_access_key=password,
+    def __init__(self, host: str, user, password, db, write_behind=False, client=None):
+        if client is None:
+            host_match = re.match(r"^dynamodb\.(?P<region>.*)\.amazonaws\.com$", host, re.IGNORECASE)
+            assert host_match, host
+            region_name = host_match.groupdict()["region"]
+            client = boto3.client(
+                "dynamodb",
+                region_name=region_name,
+                aws_access_key_id=user,
+                aws_secret_access_key=password,
+            )
+        self.client = client
+        self.write_behind = write_behind
+        self.autocommit = True
+        self.write_buffer = WriteBuffer()
+        self.stats = None
+
+        events = self.client.meta.events
+        events.register("provide-client-params.dynamodb.*", self._return_consumed_capacity)
+        events.register("before-call.dynamodb.*", self._before_call)
+        events.register("after-call.dynamodb.*", self._after_call)
+
+    def _return_consumed_capacity(self, params, model, **kwargs):
+        if model.input_shape is not None and "ReturnConsumedCapacity" in model.input_shape.members:
+            params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+    def _before_call(self, context, **kwargs):
+        context["started"] = time.perf_counter()
+
+    def _after_call(self, parsed, context, **kwargs):
+        if self.stats is None or "started" not in context:
+            return
+
+        self.stats.add_request(
+            time.perf_counter() - context["started"],
+            rows_scanned=parsed.get("ScannedCount", len(parsed.get("Items", []))),
+            page="Items" in parsed,
+            **_capacity_units(parsed),
         )
 
+    @property
+    def buffering(self) -> bool:
+        """Whether writes are deferred until commit."""
+        return bool(self.write_behind) and not self.autocommit
+
     def cursor(self) -> Cursor:
         return Cursor(self)
 
+    def flush(self):
+        """
+        Send buffered writes as one ExecuteTransaction request if write_behind is "atomic",
+        otherwise as BatchExecuteStatement requests, which are not atomic.
+        """
+        statements = [{"Statement": statement} for statement in self.write_buffer.statements()]
+        self.write_buffer.clear()
+        if not statements:
+            return
+
+        if self.write_behind == "atomic":
+            if len(statements) > TRANSACT_STATEMENTS_LIMIT:
+                raise NotSupportedError(f"Transaction exceeds {TRANSACT_STATEMENTS_LIMIT} writes.")
+            self.client.execute_transaction(TransactStatements=statements)
+            return
+
+        for start in range(0, len(statements), BATCH_STATEMENTS_LIMIT):
+            response = self.client.batch_execute_statement(
+                Statements=statements[start : start + BATCH_STATEMENTS_LIMIT]
+            )
+            errors = [item["Error"] for item in response["Responses"] if "Error" in item]
+            if errors:
+                raise DatabaseError("; ".join(f"{error['Code']}: {error['Message']}" for error in errors))
+
+    def commit(self):
+        if not self.write_buffer:
+            return
+
+        self.stats = QueryStats("COMMIT")
+        self.stats.access_path = "execute_transaction" if self.write_behind == "atomic" else "batch_execute_statement"
+        try:
+            self.flush()
+        finally:
+            self.stats.finish()
+            self.stats = None
+
+    def rollback(self):
+        self.write_buffer.clear()
+
+    def export(self, table_name: str, columns, chunk_size=10000, as_numpy=False):
+        """
+        Scan a table and yield chunks of ``chunk_size`` rows mapping each column
+        to an array of its values, see ``djanble.export``.
+        """
+        if self.write_buffer:
+            self.flush()
+
+        buffers = ColumnBuffers(columns, chunk_size, as_numpy, {"_pid": "int", "id": "int"})
+        statement = 'SELECT {} FROM "{}"'.format(", ".join(f'"{column}"' for column in columns), table_name)
+        pagination = {}
+        while True:
+            response = self.client.execute_statement(Statement=statement, **pagination)
+            items = response["Items"]
+            offset = buffers.grow(len(items))
+            for column, values in buffers.columns.items():
+                values[offset:] = [_from_attribute_value(item.get(column)) for item in items]
+            yield from buffers.chunks()
+
+            if "NextToken" not in response:
+                break
+            pagination = {"NextToken": response["NextToken"]}
+        yield from buffers.chunks(final=True)
+
 
-def connect(host, user=None, password=None, db=None):
-    return Connection(host, user, password, db)
+def connect(host, user=None, password=None, db=None, write_behind=False):
+    return Connection(host, user, password, db, write_behind)
@@ -0,0 +1,531 @@
+"""
+In-memory stand-in for the DynamoDB service.
+
+``FakeDynamoDB`` understands the PartiQL statements djanble sends: ``INSERT``
+of a literal item, ``UPDATE`` and ``DELETE`` by full primary key, and
+``SELECT`` with ``=``, ``<>``, ``<``, ``<=``, ``>``, ``>=`` and ``IN``
+conditions joined by ``AND``. Its client emits the same botocore events as a
+boto3 client, so the djanble instrumentation is exercised as it is against the
+real service.
+
+    service = FakeDynamoDB(latency=0.002, page_size=1000)
+    conn = service.connect()
+"""
+
+import operator
+import re
+import time
+from collections import Counter
+from decimal import Decimal
+from functools import lru_cache
+from itertools import islice
+from types import SimpleNamespace
+
+import botocore.session
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
+from botocore.hooks import HierarchicalEmitter
+
+from .dbapi2 import Connection
+
+TOKEN_REGEXP = re.compile(
+    r"""\s*(?:
+        "(?P<identifier>[^"]*)"
+        |'(?P<string>(?:[^']|'')*)'
+        |(?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+        |(?P<operator><>|<=|>=|[=<>{}\[\](),:*])
+        |(?P<word>[A-Za-z_][0-9A-Za-z_]*)
+    )""",
+    re.X,
+)
+
+COMPARISONS = {
+    "=": operator.eq,
+    "<>": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "IN": lambda value, values: value in values,
+}
+
+_serializer = TypeSerializer()
+
+
+@lru_cache(maxsize=None)
+def _service_model():
+    return botocore.session.get_session().get_service_model("dynamodb")
+
+
+def _error(code: str, message: str, operation_name="ExecuteStatement") -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation_name)
+
+
+def _serialize(item: dict) -> dict:
+    return {name: _serializer.serialize(value) for name, value in item.items()}
+
+
+def tokenize(statement: str) -> list:
+    tokens = []
+    position = 0
+    statement = statement.rstrip().rstrip(";")
+    while position < len(statement):
+        token_match = TOKEN_REGEXP.match(statement, position)
+        if not token_match:
+            raise _error("ValidationException", f"Unexpected input at {statement[position:position + 20]!r}")
+        position = token_match.end()
+        kind = token_match.lastgroup
+        value = token_match.group(kind)
+        if kind == "string":
+            value = value.replace("''", "'")
+        elif kind == "number":
+            value = int(value) if re.fullmatch(r"-?\d+", value) else Decimal(value)
+        tokens.append((kind, value))
+    return tokens
+
+
+class Parser:
+    """Recursive descent parser of the PartiQL subset."""
+
+    def __init__(self, statement: str):
+        self.tokens = tokenize(statement)
+        self.position = 0
+
+    def peek(self, *expected) -> bool:
+        return self.position < len(self.tokens) and self.keyword(self.tokens[self.position]) in expected
+
+    def keyword(self, token):
+        kind, value = token
+        return value.upper() if kind == "word" else value if kind == "operator" else None
+
+    def next(self):
+        if self.position >= len(self.tokens):
+            raise _error("ValidationException", "Unexpected end of statement")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, *expected):
+        token = self.next()
+        value = self.keyword(token)
+        if value not in expected:
+            raise _error("ValidationException", f"Expected {' or '.join(expected)}, got {value!r}")
+        return value
+
+    def identifier(self) -> str:
+        kind, value = self.next()
+        if kind not in ("identifier", "word"):
+            raise _error("ValidationException", f"Expected identifier, got {value!r}")
+        return value
+
+    def literal(self):
+        token = self.next()
+        kind, value = token
+        if kind in ("string", "number"):
+            return value
+        if self.keyword(token) in ("TRUE", "FALSE"):
+            return self.keyword(token) == "TRUE"
+        if self.keyword(token) == "NULL":
+            return None
+        if value == "{":
+            item = {}
+            while not self.peek("}"):
+                kind, key = self.next()
+                if kind not in ("string", "identifier"):
+                    raise _error("ValidationException", f"Expected attribute name, got {key!r}")
+                self.expect(":")
+                item[key] = self.literal()
+                if not self.peek("}"):
+                    self.expect(",")
+            self.next()
+            return item
+        if value == "[":
+            return self.literal_list("]")
+        raise _error("ValidationException", f"Expected literal, got {value!r}")
+
+    def literal_list(self, closing: str) -> list:
+        values = []
+        while not self.peek(closing):
+            values.append(self.literal())
+            if not self.peek(closing):
+                self.expect(",")
+        self.next()
+        return values
+
+    def conditions(self) -> list:
+        """``(attribute, operator, value)`` triples of an AND-only condition."""
+        conditions = []
+        while True:
+            if self.peek("("):
+                self.next()
+                conditions.extend(self.conditions())
+                self.expect(")")
+            else:
+                name = self.identifier()
+                op = self.expect(*COMPARISONS)
+                if op == "IN":
+                    closing = {"(": ")", "[": "]"}[self.expect("(", "[")]
+                    conditions.append((name, op, self.literal_list(closing)))
+                else:
+                    conditions.append((name, op, self.literal()))
+            if not self.peek("AND"):
+                return conditions
+            self.next()
+
+    def end(self):
+        if self.position < len(self.tokens):
+            raise _error("ValidationException", f"Unexpected {self.tokens[self.position][1]!r}")
+
+
+def _matches(item: dict, conditions: list) -> bool:
+    try:
+        return all(name in item and COMPARISONS[op](item[name], value) for name, op, value in conditions)
+    except TypeError:
+        # Values of different types never match
+        return False
+
+
+class FakeTable:
+    def __init__(self, table_name: str, key_schema: list):
+        self.table_name = table_name
+        self.key_names = [schema["AttributeName"] for schema in sorted(key_schema, key=lambda s: s["KeyType"])]
+        self.items = {}
+        self._sorted_keys = None
+
+    def key_of(self, item: dict) -> tuple:
+        return tuple(item[name] for name in self.key_names)
+
+    def sorted_keys(self) -> list:
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self.items)
+        return self._sorted_keys
+
+    def put(self, key: tuple, item: dict):
+        if key not in self.items:
+            self._sorted_keys = None
+        self.items[key] = item
+
+    def remove(self, key: tuple):
+        if self.items.pop(key, None) is not None:
+            self._sorted_keys = None
+
+    def lookup_keys(self, conditions: list):
+        """The keys to read when the condition fixes every key attribute, or None to scan."""
+        values = {}
+        for name, op, value in conditions:
+            if name in self.key_names and op == "=":
+                values[name] = [value]
+            elif name in self.key_names and op == "IN":
+                values[name] = value
+        if len(values) != len(self.key_names):
+            return None
+        keys = [()]
+        for name in self.key_names:
+            keys = [key + (value,) for key in keys for value in values[name]]
+        return keys
+
+    def full_key(self, conditions: list) -> tuple:
+        keys = self.lookup_keys([condition for condition in conditions if condition[1] == "="])
+        if keys is None:
+            raise _error(
+                "ValidationException", "Where clause does not contain a mandatory equality on all key attributes"
+            )
+        return keys[0]
+
+
+class FakeDynamoDB:
+    """
+    In-memory DynamoDB instance.
+
+    ``latency`` seconds are slept on every request, ``page_size`` caps the
+    items evaluated by an ``ExecuteStatement`` page, and ``requests`` counts
+    requests by operation name. Consumed capacity is approximated as half a
+    read unit per item evaluated and one write unit per item written.
+    """
+
+    batch_statements_limit = 25
+    transact_statements_limit = 100
+
+    def __init__(self, latency: float = 0.0, page_size: int = 1000):
+        self.latency = latency
+        self.page_size = page_size
+        self.tables = {}
+        self.requests = Counter()
+
+    def connect(self, write_behind=False) -> Connection:
+        return Connection("fake.dynamodb", None, None, None, write_behind, client=FakeDynamoDBClient(self))
+
+    def create_table(self, table_name: str):
+        """Create a table like ``CREATE TABLE`` does."""
+        key_schema = [{"AttributeName": "_pid", "KeyType": "HASH"}, {"AttributeName": "id", "KeyType": "RANGE"}]
+        self.tables[table_name] = FakeTable(table_name, key_schema)
+
+    def load(self, table_name: str, rows):
+        """Insert ``(id, attributes)`` pairs directly, bypassing requests."""
+        table = self.tables[table_name]
+        for pk, attributes in rows:
+            table.put((0, pk), {**attributes, "_pid": 0, "id": pk})
+
+    def request(self, operation_name: str, params: dict) -> dict:
+        self.requests[operation_name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return getattr(self, f"_{operation_name}")(**params)
+
+    def _table(self, table_name: str) -> FakeTable:
+        if table_name not in self.tables:
+            raise _error("ResourceNotFoundException", f"Requested resource not found: Table: {table_name} not found")
+        return self.tables[table_name]
+
+    def _run(self, statement: str, limit=None, next_token=None, journal=None) -> dict:
+        """Execute one statement. Writes record the previous item in ``journal``."""
+        parser = Parser(statement)
+        verb = parser.expect("SELECT", "INSERT", "UPDATE", "DELETE")
+        if verb == "SELECT":
+            return self._select(parser, limit, next_token)
+
+        if verb == "INSERT":
+            parser.expect("INTO")
+            table = self._table(parser.identifier())
+            parser.expect("VALUE")
+            item = parser.literal()
+            parser.end()
+            if not isinstance(item, dict) or any(name not in item for name in table.key_names):
+                raise _error("ValidationException", "One or more parameter values were invalid: Missing the key")
+            key = table.key_of(item)
+            if key in table.items:
+                raise _error("DuplicateItemException", "Duplicate primary key exists in table")
+        elif verb == "UPDATE":
+            table = self._table(parser.identifier())
+            changes = []
+            while parser.peek("SET", "REMOVE"):
+                if parser.next()[1] == "SET":
+                    name = parser.identifier()
+                    parser.expect("=")
+                    changes.append((name, parser.literal()))
+                else:
+                    changes.append((parser.identifier(), KeyError))
+            parser.expect("WHERE")
+            key = table.full_key(parser.conditions())
+            parser.end()
+            if key not in table.items:
+                raise _error("ConditionalCheckFailedException", "The conditional request failed")
+            item = dict(table.items[key])
+            for name, value in changes:
+                if name in table.key_names:
+                    raise _error(
+                        "ValidationException", f"Cannot update attribute {name}. This attribute is part of the key"
+                    )
+                if value is KeyError:
+                    item.pop(name, None)
+                else:
+                    item[name] = value
+        else:
+            parser.expect("FROM")
+            table = self._table(parser.identifier())
+            parser.expect("WHERE")
+            key = table.full_key(parser.conditions())
+            parser.end()
+            item = None
+
+        if journal is not None:
+            journal.append((table, key, table.items.get(key)))
+        if item is None:
+            table.remove(key)
+        else:
+            table.put(key, item)
+        return {"ConsumedCapacity": self._capacity(table.table_name, write=1)}
+
+    def _select(self, parser: Parser, limit, next_token) -> dict:
+        if parser.peek("*"):
+            parser.next()
+            names = None
+        else:
+            names = [parser.identifier()]
+            while parser.peek(","):
+                parser.next()
+                names.append(parser.identifier())
+        parser.expect("FROM")
+        table = self._table(parser.identifier())
+        conditions = []
+        if parser.peek("WHERE"):
+            parser.next()
+            conditions = parser.conditions()
+        parser.end()
+
+        keys = table.lookup_keys(conditions)
+        start = int(next_token or 0)
+        page_size = min(limit or self.page_size, self.page_size)
+        if keys is None:
+            keys = table.sorted_keys()
+            page_keys = list(islice(keys, start, start + page_size))
+        else:
+            keys = sorted(key for key in set(keys) if key in table.items)
+            page_keys = keys[start : start + page_size]
+
+        items = []
+        for key in page_keys:
+            item = table.items[key]
+            if _matches(item, conditions):
+                if names is not None:
+                    item = {name: item[name] for name in names if name in item}
+                items.append(_serialize(item))
+
+        response = {
+            "Items": items,
+            "ScannedCount": len(page_keys),
+            "ConsumedCapacity": self._capacity(table.table_name, read=max(len(page_keys), 1) / 2),
+        }
+        if start + page_size < len(keys):
+            response["NextToken"] = str(start + page_size)
+        return response
+
+    def _capacity(self, table_name: str, read=0, write=0) -> dict:
+        return {
+            "TableName": table_name,
+            "CapacityUnits": read + write,
+            "ReadCapacityUnits": read,
+            "WriteCapacityUnits": write,
+        }
+
+    def _with_capacity(self, response: dict, return_consumed_capacity) -> dict:
+        capacity = response.pop("ConsumedCapacity", None)
+        if return_consumed_capacity in ("TOTAL", "INDEXES") and capacity:
+            response["ConsumedCapacity"] = capacity
+        return response
+
+    def _ExecuteStatement(self, Statement, Limit=None, NextToken=None, ReturnConsumedCapacity="NONE", **kwargs):
+        return self._with_capacity(self._run(Statement, Limit, NextToken), ReturnConsumedCapacity)
+
+    def _BatchExecuteStatement(self, Statements, ReturnConsumedCapacity="NONE", **kwargs):
+        if len(Statements) > self.batch_statements_limit:
+            raise _error(
+                "ValidationException",
+                f"Member must have length less than or equal to {self.batch_statements_limit}",
+                "BatchExecuteStatement",
+            )
+
+        responses = []
+        capacity = {}
+        for statement in Statements:
+            try:
+                response = self._run(statement["Statement"])
+            except ClientError as e:
+                error = e.response["Error"]
+                responses.append(
+                    {"Error": {"Code": error["Code"].replace("Exception", ""), "Message": error["Message"]}}
+                )
+                continue
+            consumed = response["ConsumedCapacity"]
+            table_capacity = capacity.setdefault(consumed["TableName"], self._capacity(consumed["TableName"]))
+            for unit in ("CapacityUnits", "ReadCapacityUnits", "WriteCapacityUnits"):
+                table_capacity[unit] += consumed[unit]
+            responses.append({"TableName": consumed["TableName"]})
+
+        return self._with_capacity(
+            {"Responses": responses, "ConsumedCapacity": list(capacity.values())}, ReturnConsumedCapacity
+        )
+
+    def _ExecuteTransaction(self, TransactStatements, ReturnConsumedCapacity="NONE", **kwargs):
+        if len(TransactStatements) > self.transact_statements_limit:
+            raise _error(
+                "ValidationException",
+                f"Member must have length less than or equal to {self.transact_statements_limit}",
+                "ExecuteTransaction",
+            )
+
+        journal = []
+        capacity = {}
+        for position, statement in enumerate(TransactStatements):
+            try:
+                consumed = self._run(statement["Statement"], journal=journal)["ConsumedCapacity"]
+            except ClientError as e:
+                for table, key, item in reversed(journal):
+                    if item is None:
+                        table.remove(key)
+                    else:
+                        table.put(key, item)
+                reasons = [{"Code": "None"}] * len(TransactStatements)
+                reasons[position] = {
+                    "Code": e.response["Error"]["Code"].replace("Exception", ""),
+                    "Message": e.response["Error"]["Message"],
+                }
+                raise ClientError(
+                    {
+                        "Error": {"Code": "TransactionCanceledException", "Message": "Transaction cancelled"},
+                        "CancellationReasons": reasons,
+                    },
+                    "ExecuteTransaction",
+                )
+            table_capacity = capacity.setdefault(consumed["TableName"], self._capacity(consumed["TableName"]))
+            for unit in ("CapacityUnits", "ReadCapacityUnits", "WriteCapacityUnits"):
+                # Transactional writes consume twice the units
+                table_capacity[unit] += 2 * consumed[unit]
+
+        return self._with_capacity(
+            {"Responses": [], "ConsumedCapacity": list(capacity.values())}, ReturnConsumedCapacity
+        )
+
+    def _CreateTable(self, TableName, KeySchema, **kwargs):
+        if TableName in self.tables:
+            raise _error("ResourceInUseException", f"Table already exists: {TableName}", "CreateTable")
+        self.tables[TableName] = FakeTable(TableName, KeySchema)
+        return {"TableDescription": {"TableName": TableName, "KeySchema": KeySchema, "TableStatus": "ACTIVE"}}
+
+    def _DeleteTable(self, TableName, **kwargs):
+        self._table(TableName)
+        del self.tables[TableName]
+        return {"TableDescription": {"TableName": TableName, "TableStatus": "DELETING"}}
+
+    def _ListTables(self, **kwargs):
+        return {"TableNames": sorted(self.tables)}
+
+
+class FakeDynamoDBClient:
+    """boto3 DynamoDB client whose requests are served by ``service`` instead of the network."""
+
+    def __init__(self, service: FakeDynamoDB):
+        self.service = service
+        self.meta = SimpleNamespace(events=HierarchicalEmitter(), service_model=_service_model())
+
+    def _make_api_call(self, operation_name: str, params: dict) -> dict:
+        model = self.meta.service_model.operation_model(operation_name)
+        context = {}
+        events = self.meta.events
+        events.emit(f"provide-client-params.dynamodb.{operation_name}", params=params, model=model, context=context)
+        events.emit(
+            f"before-call.dynamodb.{operation_name}", model=model, params=params, request_signer=None, context=context
+        )
+        try:
+            parsed = self.service.request(operation_name, params)
+        except ClientError as e:
+            events.emit(
+                f"after-call.dynamodb.{operation_name}",
+                http_response=None,
+                parsed=e.response,
+                model=model,
+                context=context,
+            )
+            raise
+        events.emit(
+            f"after-call.dynamodb.{operation_name}", http_response=None, parsed=parsed, model=model, context=context
+        )
+        return parsed
+
+    def execute_statement(self, **params):
+        return self._make_api_call("ExecuteStatement", params)
+
+    def batch_execute_statement(self, **params):
+        return self._make_api_call("BatchExecuteStatement", params)
+
+    def execute_transaction(self, **params):
+        return self._make_api_call("ExecuteTransaction", params)
+
+    def create_table(self, **params):
+        return self._make_api_call("CreateTable", params)
+
+    def delete_table(self, **params):
+        return self._make_api_call("DeleteTable", params)
+
+    def list_tables(self, **params):
+        return self._make_api_call("ListTables", params)
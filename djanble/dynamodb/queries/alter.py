@@ -1,2 +1,6 @@
+def explain(conn, sql: str, params) -> dict:
+    return {"access_path": "noop"}
+
+
 def execute(conn, sql: str, params):
-    pass
+    conn.stats.access_path = explain(conn, sql, params)["access_path"]
@@ -0,0 +1,29 @@
+import re
+
+from ..transaction import delete_statement
+
+DELETE_REGEXP = r'\s*DELETE\s+FROM\s+"(?P<table>\S+?)"\s+WHERE\s+".*?"\."id"\s+(?:=\s*%s|IN\s+\(%s(,\s*%s)*\))\s*$'
+
+
+def explain(conn, sql: str, params) -> dict:
+    if conn.buffering and re.match(DELETE_REGEXP, sql, re.IGNORECASE):
+        return {"access_path": "write_buffer"}
+    return {"access_path": "partiql"}
+
+
+def execute(conn, sql: str, params):
+    conn.stats.access_path = explain(conn, sql, params)["access_path"]
+    delete_match = re.match(DELETE_REGEXP, sql, re.IGNORECASE)
+    if not delete_match:
+        conn.flush()
+        conn.client.execute_statement(Statement=sql % params)
+        return
+
+    table_name = delete_match.groupdict()["table"]
+    for param in params:
+        if conn.buffering:
+            conn.write_buffer.delete(table_name, param)
+        else:
+            conn.client.execute_statement(Statement=delete_statement(table_name, param))
+
+    return {"rowcount": len(params)}
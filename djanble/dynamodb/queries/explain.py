@@ -0,0 +1,16 @@
+import importlib
+import re
+
+
+def execute(conn, sql: str, params):
+    explained_sql = re.sub(r"^\s*EXPLAIN\s+", "", sql, flags=re.IGNORECASE)
+    statement = explained_sql.split()[0].lower()
+    conn.stats.access_path = "explain"
+    try:
+        module = importlib.import_module(f".{statement}", package=__package__)
+        plan = module.explain(conn, explained_sql, params)
+    except ModuleNotFoundError:
+        plan = {"access_path": "partiql"}
+
+    result = [(key, str(value)) for key, value in plan.items()]
+    return {"rowcount": len(result), "result": iter(result)}
@@ -1,8 +1,15 @@
 import re
 import time
 
+from ..transaction import insert_statement
+
+
+def explain(conn, sql: str, params) -> dict:
+    return {"access_path": "write_buffer" if conn.buffering else "partiql"}
+
 
 def execute(conn, sql: str, params):
+    conn.stats.access_path = explain(conn, sql, params)["access_path"]
     create_regexp = r'\s*INSERT\s+INTO\s+"?(?P<table>\S*?)"?\s+\((?P<columns>[0-9A-Za-z_,"\s]*)\)\s+VALUES\s+\(%s(?:,\s*%s)*\)\s*;?\s*$'
     create_match = re.match(create_regexp, sql, re.IGNORECASE)
     if not create_match:
@@ -13,6 +20,9 @@ def execute(conn, sql: str, params):
     items = dict(zip(columns, params))
     items["_pid"] = 0
     items["id"] = time.time_ns()
-    conn.client.execute_statement(Statement=f'INSERT INTO "{table}" VALUE {items}')
+    if conn.buffering:
+        conn.write_buffer.insert(table, items)
+    else:
+        conn.client.execute_statement(Statement=insert_statement(table, items))
 
     return {"lastrowid": items["id"]}
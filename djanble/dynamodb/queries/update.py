@@ -0,0 +1,55 @@
+import re
+
+from ..transaction import update_statement
+
+UPDATE_REGEXP = r'\s*UPDATE\s+"(?P<table>\S+?)"\s+SET\s+(?P<assignments>.+?)\s+WHERE\s+"\S+"\."id"\s+=\s+%s\s*$'
+ASSIGNMENT_REGEXP = re.compile(r'\s*"(?P<column>[^"]+)"\s*=\s*(?P<value>%s|NULL)\s*(?:,|$)')
+
+
+def parse_assignments(segment: str):
+    """``(column, value)`` pairs of the SET clause, or None if any value is an expression."""
+    assignments = []
+    position = 0
+    while position < len(segment):
+        assignment_match = ASSIGNMENT_REGEXP.match(segment, position)
+        if not assignment_match:
+            return None
+        assignments.append(assignment_match.group("column", "value"))
+        position = assignment_match.end()
+    return assignments
+
+
+def parse_update(sql: str):
+    """``(table, assignments)`` of an update of one row by id, or None if it must run as raw PartiQL."""
+    update_match = re.match(UPDATE_REGEXP, sql, re.IGNORECASE)
+    if not update_match:
+        return None
+    assignments = parse_assignments(update_match.groupdict()["assignments"])
+    if assignments is None:
+        return None
+    return update_match.groupdict()["table"], assignments
+
+
+def explain(conn, sql: str, params) -> dict:
+    if conn.buffering and parse_update(sql):
+        return {"access_path": "write_buffer"}
+    return {"access_path": "partiql"}
+
+
+def execute(conn, sql: str, params):
+    conn.stats.access_path = explain(conn, sql, params)["access_path"]
+    parsed = parse_update(sql)
+    if not parsed:
+        conn.flush()
+        conn.client.execute_statement(Statement=sql % params)
+        return
+
+    table_name, parsed_assignments = parsed
+    params_iter = iter(params)
+    assignments = {column: next(params_iter) if value == "%s" else None for column, value in parsed_assignments}
+
+    if conn.buffering:
+        return {"rowcount": int(conn.write_buffer.update(table_name, params[-1], assignments))}
+
+    conn.client.execute_statement(Statement=update_statement(table_name, params[-1], assignments))
+    return {"rowcount": 1}
@@ -0,0 +1,87 @@
+BINARY_TYPES = (bytes, bytearray, memoryview)
+
+
+def check_values(values):
+    # PartiQL has no binary literal, binary attributes could only be sent as statement parameters
+    if any(isinstance(value, BINARY_TYPES) for value in values):
+        raise TypeError("Binary values cannot be written through PartiQL statements.")
+
+
+def to_partiql(value) -> str:
+    check_values([value])
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'{}'".format(str(value).replace("'", "''"))
+
+
+def insert_statement(table_name: str, item: dict) -> str:
+    # NULL columns are left out, as UPDATE removes them
+    values = ", ".join(f"{to_partiql(name)}: {to_partiql(value)}" for name, value in item.items() if value is not None)
+    return f'INSERT INTO "{table_name}" VALUE {{{values}}}'
+
+
+def update_statement(table_name: str, pk, assignments: dict) -> str:
+    clauses = " ".join(
+        f'REMOVE "{column}"' if value is None else f'SET "{column}" = {to_partiql(value)}'
+        for column, value in assignments.items()
+    )
+    return f'UPDATE "{table_name}" {clauses} WHERE "_pid" = 0 AND "id" = {pk}'
+
+
+def delete_statement(table_name: str, pk) -> str:
+    return f'DELETE FROM "{table_name}" WHERE "_pid" = 0 AND "id" = {pk}'
+
+
+class WriteBuffer:
+    """
+    Item writes deferred until the surrounding transaction commits.
+
+    Writes are keyed by table and primary key: repeated updates of an item
+    collapse into one statement, updates of a pending insert are folded into
+    the insert, and deleting a pending insert drops it altogether. An update
+    of an item whose delete is buffered matches nothing.
+    """
+
+    def __init__(self):
+        self.items = {}
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def insert(self, table_name: str, item: dict):
+        check_values(item.values())
+        self.items[(table_name, item["id"])] = ("insert", dict(item))
+
+    def update(self, table_name: str, pk, assignments: dict) -> bool:
+        """Buffer an update of an item; returns False if the item is already deleted."""
+        check_values(assignments.values())
+        action, pending = self.items.get((table_name, pk), ("update", {}))
+        if action == "delete":
+            return False
+        self.items[(table_name, pk)] = (action, {**pending, **assignments})
+        return True
+
+    def delete(self, table_name: str, pk):
+        action, _ = self.items.get((table_name, pk), ("delete", None))
+        if action == "insert":
+            del self.items[(table_name, pk)]
+        else:
+            self.items[(table_name, pk)] = ("delete", None)
+
+    def clear(self):
+        self.items.clear()
+
+    def statements(self):
+        """Yield the PartiQL statements of the buffered writes."""
+        for (table_name, pk), (action, values) in self.items.items():
+            if action == "insert":
+                yield insert_statement(table_name, values)
+            elif action == "update":
+                yield update_statement(table_name, pk, values)
+            else:
+                yield delete_statement(table_name, pk)
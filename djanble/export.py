@@ -0,0 +1,165 @@
+"""
+Column-oriented bulk export shared by the backends.
+
+``Connection.export`` of either backend streams the pages of a table scan
+into one buffer per column and yields ``Chunk``s of ``chunk_size`` rows.
+
+Each column has a kind, ``"int"``, ``"float"`` or ``"object"``, taken from the
+table schema where there is one and otherwise from the values of its first
+chunk. It is kept for later chunks unless their values do not fit it, in which
+case an int column is widened to float and any other column to object.
+Numeric columns are ``array.array``s, and object columns lists, or NumPy
+arrays of the matching dtype with ``as_numpy=True``.
+
+    with open("problems.csv", "w", newline="") as f:
+        write_csv(f, ["id", "title"], conn.export("oj_problem", ["id", "title"]))
+"""
+
+import array
+import csv
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+TYPECODES = {"int": "q", "float": "d"}
+DTYPES = {"int": "int64", "float": "float64"}
+NULL_VALUES = {"int": 0, "float": float("nan")}
+
+
+def column_kind(values: list, kind=None) -> str:
+    """The narrowest kind holding ``values``, no narrower than the column's current ``kind``."""
+    types = {type(value) for value in values if value is not None}
+    if kind is None and not types:
+        return "object"
+    if kind in (None, "int") and types <= {int}:
+        return "int"
+    if kind in (None, "int", "float") and types <= {int, float}:
+        return "float"
+    return "object"
+
+
+def column_array(values: list, kind: str, as_numpy=False):
+    """Values of one column as an array of ``kind``; NULLs of numeric columns become 0 or NaN."""
+    if kind not in TYPECODES:
+        return numpy.array(values, dtype=object) if as_numpy else values
+
+    if None in values:
+        values = [NULL_VALUES[kind] if value is None else value for value in values]
+    try:
+        typed = array.array(TYPECODES[kind], values)
+    except TypeError:
+        raise TypeError(f"Values of an {kind} column must be numbers") from None
+    return numpy.frombuffer(typed, dtype=DTYPES[kind]) if as_numpy else typed
+
+
+class Chunk(dict):
+    """
+    Column arrays of a run of rows. ``kinds`` maps every column to its kind and
+    ``nulls`` maps numeric columns holding NULLs to the positions of those NULLs.
+    """
+
+    def __init__(self, columns: dict, kinds: dict, nulls: dict):
+        super().__init__(columns)
+        self.kinds = kinds
+        self.nulls = nulls
+
+    def with_nulls(self, column: str):
+        """The values of a column with its NULLs as None."""
+        values = self[column]
+        if column not in self.nulls:
+            return values
+        values = list(values)
+        for position in self.nulls[column]:
+            values[position] = None
+        return values
+
+
+class ColumnBuffers:
+    """Per-column value lists filled page by page and cut into chunks."""
+
+    def __init__(self, columns, chunk_size: int, as_numpy=False, kinds=None):
+        if as_numpy and numpy is None:
+            raise ImportError("as_numpy=True requires NumPy")
+        self.columns = {column: [] for column in columns}
+        self.kinds = {column: kind for column, kind in (kinds or {}).items() if column in self.columns}
+        self.chunk_size = chunk_size
+        self.as_numpy = as_numpy
+        self.length = 0
+
+    def grow(self, count: int) -> int:
+        """Append ``count`` rows of NULLs to every column and return the offset of the first."""
+        offset = self.length
+        for values in self.columns.values():
+            values.extend([None] * count)
+        self.length += count
+        return offset
+
+    def chunks(self, final=False):
+        """Yield full chunks, and with ``final`` the remaining rows too."""
+        while self.length >= self.chunk_size or (final and self.length):
+            size = min(self.chunk_size, self.length)
+            arrays = {}
+            nulls = {}
+            for column, values in self.columns.items():
+                chunk_values = values[:size]
+                del values[:size]
+                kind = self.kinds[column] = column_kind(chunk_values, self.kinds.get(column))
+                if kind in TYPECODES and None in chunk_values:
+                    nulls[column] = [position for position, value in enumerate(chunk_values) if value is None]
+                arrays[column] = column_array(chunk_values, kind, self.as_numpy)
+            self.length -= size
+            yield Chunk(arrays, dict(self.kinds), nulls)
+
+
+def write_csv(file, columns, chunks):
+    """Write exported chunks as CSV with a header row."""
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows(zip(*(chunk.with_nulls(column) for column in columns)))
+
+
+def write_parquet(path, columns, chunks):
+    """Write exported chunks as a Parquet file, one row group per chunk. Requires pyarrow."""
+    if pyarrow is None:
+        raise ImportError("write_parquet requires pyarrow")
+
+    arrow_types = {"int": pyarrow.int64(), "float": pyarrow.float64()}
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pyarrow.table(
+                {
+                    column: pyarrow.array(chunk.with_nulls(column), arrow_types.get(chunk.kinds[column]))
+                    for column in columns
+                }
+            )
+            if writer is None:
+                # Object columns without any value yet are written as strings
+                schema = pyarrow.schema(
+                    field.with_type(pyarrow.string()) if pyarrow.types.is_null(field.type) else field
+                    for field in table.schema
+                )
+                writer = pyarrow.parquet.ParquetWriter(path, schema)
+            try:
+                table = table.cast(writer.schema)
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowNotImplementedError):
+                raise TypeError(
+                    "A column was widened after the first chunk was written; export with a larger chunk_size"
+                ) from None
+            writer.write_table(table)
+        if writer is None:
+            schema = pyarrow.schema([(column, pyarrow.string()) for column in columns])
+            writer = pyarrow.parquet.ParquetWriter(path, schema)
+    finally:
+        if writer is not None:
+            writer.close()
@@ -0,0 +1,109 @@
+"""
+Per-statement instrumentation shared by the backends.
+
+Every statement executed by a cursor produces a ``QueryStats`` which is passed
+to the registered hooks and logged to the ``djanble.queries`` logger at DEBUG
+level. Under ``DEBUG`` the Django backends also merge it into the matching
+``connection.queries`` record.
+"""
+
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("djanble.queries")
+
+hooks = []
+
+
+def register(hook):
+    """Call ``hook(stats)`` after every statement. Usable as a decorator."""
+    hooks.append(hook)
+    return hook
+
+
+def unregister(hook):
+    hooks.remove(hook)
+
+
+class QueryStats:
+    """
+    Measurements of one statement.
+
+    ``network_time`` covers the requests sent to the service, ``decode_time``
+    the conversion of returned rows, and ``parse_time`` everything else,
+    that is SQL parsing and planning.
+    """
+
+    def __init__(self, sql: str, params=None):
+        self.sql = sql
+        self.params = params
+        self.access_path = None
+        self.time = 0.0
+        self.network_time = 0.0
+        self.decode_time = 0.0
+        self.requests = 0
+        self.pages = 0
+        self.rows_scanned = 0
+        self.rows_returned = 0
+        self.read_capacity = 0
+        self.write_capacity = 0
+        self._started = time.perf_counter()
+        # Requests may be sent from several threads, e.g. by batch_write
+        self._lock = threading.Lock()
+
+    @property
+    def shape(self) -> str:
+        """The SQL with whitespace normalized and placeholder lists collapsed."""
+        shape = re.sub(r"\s+", " ", self.sql).strip()
+        return re.sub(r"%s(?:\s*,\s*%s)+", "%s, ...", shape)
+
+    @property
+    def parse_time(self) -> float:
+        return max(self.time - self.network_time - self.decode_time, 0.0)
+
+    def add_request(self, elapsed: float, read_capacity=0, write_capacity=0, rows_scanned=0, page=False):
+        with self._lock:
+            self.requests += 1
+            self.network_time += elapsed
+            self.read_capacity += read_capacity or 0
+            self.write_capacity += write_capacity or 0
+            self.rows_scanned += rows_scanned
+            self.pages += int(page)
+
+    @contextmanager
+    def measure_decode(self):
+        """Count time spent in the block as decode time, less the requests sent from it."""
+        network_time = self.network_time
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.decode_time += time.perf_counter() - started - (self.network_time - network_time)
+
+    def finish(self):
+        self.time = time.perf_counter() - self._started
+        for hook in hooks:
+            hook(self)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s %s", self.shape, self.as_dict())
+
+    def as_dict(self) -> dict:
+        """A record compatible with ``connection.queries``."""
+        return {
+            "sql": self.sql,
+            "time": "%.3f" % self.time,
+            "shape": self.shape,
+            "access_path": self.access_path,
+            "parse_time": "%.3f" % self.parse_time,
+            "network_time": "%.3f" % self.network_time,
+            "decode_time": "%.3f" % self.decode_time,
+            "requests": self.requests,
+            "pages": self.pages,
+            "rows_scanned": self.rows_scanned,
+            "rows_returned": self.rows_returned,
+            "read_capacity": self.read_capacity,
+            "write_capacity": self.write_capacity,
+        }
@@ -1,3 +1,4 @@
+from django.db.backends import utils
 from django.db.backends.base.base import BaseDatabaseWrapper
 from django.db.backends.base.client import BaseDatabaseClient
 from django.db.backends.base.creation import BaseDatabaseCreation
@@ -14,12 +15,27 @@ def do_nothing(*args, **kwargs):
     pass
 
 
+class CursorDebugWrapper(utils.CursorDebugWrapper):
+    def execute(self, sql, params=None):
+        try:
+            return super().execute(sql, params)
+        finally:
+            # Extend the record logged by Django with the statement measurements
+            stats = getattr(self.cursor, "stats", None)
+            if stats is not None and stats.sql == sql and self.db.queries_log:
+                record = stats.as_dict()
+                del record["sql"], record["time"]
+                self.db.queries_log[-1].update(record)
+
+
 class DatabaseIntrospection(BaseDatabaseIntrospection):
     def table_names(self, cursor: Database.Cursor, include_views=False):
         return cursor.conn.list_table()
 
 
 class DatabaseOperations(BaseDatabaseOperations):
+    explain_prefix = "EXPLAIN"
+
     def quote_name(self, name):
         if name.startswith('"') and name.endswith('"'):
             return name
@@ -30,6 +46,7 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     uses_savepoints = False
     atomic_transactions = False
     has_bulk_insert = False
+    supports_explaining_query_execution = True
 
 
 class DatabaseWrapper(BaseDatabaseWrapper):
@@ -50,6 +67,7 @@ class DatabaseWrapper(BaseDatabaseWrapper):
             "user": self.settings_dict["USER"],
             "password": self.settings_dict["PASSWORD"],
             "db": self.settings_dict["NAME"],
+            "write_behind": self.settings_dict.get("OPTIONS", {}).get("WRITE_BEHIND", False),
         }
         return kwargs
 
@@ -60,11 +78,13 @@ class DatabaseWrapper(BaseDatabaseWrapper):
     def create_cursor(self, name=None) -> Database.Cursor:
         return self.conn.cursor()
 
-    def rollback(self) -> None:
-        self.needs_rollback = False
+    def make_debug_cursor(self, cursor):
+        return CursorDebugWrapper(cursor, self)
+
+    def _set_autocommit(self, autocommit):
+        # Writes are buffered until commit while autocommit is off
+        self.conn.autocommit = autocommit
 
     init_connection_state = do_nothing
-    set_autocommit = do_nothing
-    commit = do_nothing
     validate_no_broken_transaction = do_nothing
     close = do_nothing
@@ -1,8 +1,15 @@
 import datetime
 import importlib
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import chain, islice
 
 import tablestore
 
+from ..export import ColumnBuffers
+from ..instrumentation import QueryStats
+from .transaction import WriteBuffer
+
 Date = datetime.date
 
 Time = datetime.time
@@ -11,6 +18,10 @@ Timestamp = datetime.datetime
 
 Binary = memoryview
 
+BATCH_WRITE_ROW_LIMIT = 200
+BATCH_WRITE_ROW_WORKERS = 4
+EXPORT_KINDS = {"INTEGER": "int", "DOUBLE": "float"}
+
 # Exceptions
 class Error(Exception):
     pass
@@ -38,17 +49,27 @@ class Cursor:
 
     def execute(self, sql: str, params=None):
         statement = sql.split()[0].lower()
-        print(sql, params)
         try:
             module = importlib.import_module(f"..queries.{statement}", package=__name__)
         except ModuleNotFoundError:
             raise ValueError(f"Statement {statement} not supported.")
 
-        self.result = []
-        result = module.execute(self.conn, sql, params)
-        if isinstance(result, dict):
-            for key, value in result.items():
-                setattr(self, key, value)
+        self.stats = self.conn.stats = QueryStats(sql, params)
+        try:
+            if statement == "select" and self.conn.write_buffer:
+                # Reads must see the writes buffered so far
+                self.conn.flush()
+
+            self.result = iter([])
+            result = module.execute(self.conn, sql, params)
+            if isinstance(result, dict):
+                for key, value in result.items():
+                    setattr(self, key, value)
+            if statement == "select":
+                self.stats.rows_returned = self.rowcount
+        finally:
+            self.conn.stats = None
+            self.stats.finish()
 
     def fetchmany(self, size=1):
         ret = []
@@ -69,8 +90,32 @@ class Cursor:
         pass
 
 
+def _request_stats(api_name: str, result) -> dict:
+    if isinstance(result, tuple) and result and isinstance(result[0], tablestore.CapacityUnit):
+        consumed = [result[0]]
+        if api_name == "GetRange":
+            rows_scanned = len(result[2])
+        else:
+            rows_scanned = int(api_name == "GetRow" and result[1] is not None)
+    elif isinstance(result, dict):
+        # Batch operations return one item per row, grouped by table
+        items = [item for table_items in result.values() for item in table_items]
+        consumed = [item.consumed for item in items if item.consumed]
+        rows_scanned = sum(1 for item in items if api_name == "BatchGetRow" and item.row)
+    else:
+        consumed = []
+        rows_scanned = 0
+
+    return {
+        "read_capacity": sum(capacity_unit.read for capacity_unit in consumed),
+        "write_capacity": sum(capacity_unit.write for capacity_unit in consumed),
+        "rows_scanned": rows_scanned,
+        "page": api_name == "GetRange",
+    }
+
+
 class Connection(tablestore.OTSClient):
-    def __init__(self, host, user, password, db):
+    def __init__(self, host, user, password, db, write_behind=False):
         protocol = "https"
         kwargs = {
             "end_point": f"{protocol}://{host}",
@@ -79,10 +124,120 @@ class Connection(tablestore.OTSClient):
             "instance_name": db,
         }
         super().__init__(**kwargs)
+        self.write_behind = write_behind
+        self.autocommit = True
+        self.write_buffer = WriteBuffer()
+        self.stats = None
+
+    def _request_helper(self, api_name, *args, **kwargs):
+        started = time.perf_counter()
+        result = super()._request_helper(api_name, *args, **kwargs)
+        if self.stats is not None:
+            self.stats.add_request(time.perf_counter() - started, **_request_stats(api_name, result))
+        return result
+
+    @property
+    def buffering(self) -> bool:
+        """Whether writes are deferred until commit."""
+        return self.write_behind and not self.autocommit
 
     def cursor(self) -> Cursor:
         return Cursor(self)
 
-
-def connect(host, user, password, db):
-    return Connection(host, user, password, db)
+    def _batch_write_row(self, row_items) -> int:
+        table_items = {}
+        for table_name, row_item in row_items:
+            table_items.setdefault(table_name, []).append(row_item)
+
+        request = tablestore.BatchWriteRowRequest()
+        for table_name, items in table_items.items():
+            request.add(tablestore.TableInBatchWriteRowItem(table_name, items))
+
+        response = self.batch_write_row(request)
+        failed = response.get_failed_of_put() + response.get_failed_of_update() + response.get_failed_of_delete()
+        errors = [item for item in failed if item.error_code != "OTSConditionCheckFail"]
+        if errors:
+            raise DatabaseError("; ".join(f"{item.error_code}: {item.error_message}" for item in errors))
+        return len(row_items) - len(failed)
+
+    def batch_write(self, row_items) -> int:
+        """
+        Send ``(table_name, row_item)`` pairs as concurrent BatchWriteRow requests.
+        Returns the number of rows written; rows failing their condition are skipped.
+        """
+        row_items = iter(row_items)
+        chunks = iter(lambda: list(islice(row_items, BATCH_WRITE_ROW_LIMIT)), [])
+        first_chunk = next(chunks, [])
+        second_chunk = next(chunks, None)
+        if second_chunk is None:
+            # A single request is sent inline, without the cost of a thread pool
+            return self._batch_write_row(first_chunk) if first_chunk else 0
+
+        written = 0
+        with ThreadPoolExecutor(BATCH_WRITE_ROW_WORKERS) as executor:
+            pending = set()
+            for chunk in chain([first_chunk, second_chunk], chunks):
+                if len(pending) >= BATCH_WRITE_ROW_WORKERS:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    written += sum(future.result() for future in done)
+                pending.add(executor.submit(self._batch_write_row, chunk))
+            written += sum(future.result() for future in pending)
+        return written
+
+    def flush(self):
+        """
+        Send buffered writes as BatchWriteRow requests.
+        BatchWriteRow is not atomic: rows of a failed batch may be partially written.
+        Rows that do not exist are skipped, as they are by UPDATE under autocommit.
+        """
+        row_items = list(self.write_buffer.row_items())
+        self.write_buffer.clear()
+        self.batch_write(row_items)
+
+    def commit(self):
+        if not self.write_buffer:
+            return
+
+        self.stats = QueryStats("COMMIT")
+        self.stats.access_path = "batch_write_row"
+        try:
+            self.flush()
+        finally:
+            self.stats.finish()
+            self.stats = None
+
+    def rollback(self):
+        self.write_buffer.clear()
+
+    def export(self, table_name: str, columns, chunk_size=10000, as_numpy=False):
+        """
+        Scan a table and yield chunks of ``chunk_size`` rows mapping each column
+        to an array of its values as stored, see ``djanble.export``.
+        """
+        if self.write_buffer:
+            self.flush()
+
+        table_meta = self.describe_table(table_name).table_meta
+        kinds = {
+            column_name: EXPORT_KINDS.get(column_type, "object")
+            for column_name, column_type, *_ in chain(table_meta.schema_of_primary_key, table_meta.defined_columns)
+        }
+        buffers = ColumnBuffers(columns, chunk_size, as_numpy, kinds)
+        primary_key = [("_partition", 0), ("id", tablestore.INF_MIN)]
+        end_primary_key = [("_partition", 0), ("id", tablestore.INF_MAX)]
+        while primary_key:
+            _, primary_key, row_list, _ = self.get_range(
+                table_name, "FORWARD", primary_key, end_primary_key, list(columns)
+            )
+            offset = buffers.grow(len(row_list))
+            for position, row in enumerate(row_list, offset):
+                for column in chain(row.primary_key, row.attribute_columns):
+                    values = buffers.columns.get(column[0])
+                    if values is not None:
+                        values[position] = column[1]
+            yield from buffers.chunks()
+        yield from buffers.chunks(final=True)
+
+
+def connect(host, user, password, db, write_behind=False):
+    return Connection(host, user, password, db, write_behind)
@@ -0,0 +1,314 @@
+"""
+In-memory stand-in for the Tablestore service.
+
+``FakeTablestore`` serves the requests that ``OTSClient`` methods send through
+``_request_helper``, so the SDK request/response objects and the djanble
+instrumentation are exercised as they are against the real service.
+
+    service = FakeTablestore(latency=0.002, page_size=5000)
+    service.create_index("app_book", "author_id")
+    conn = service.connect()
+"""
+
+import time
+from bisect import bisect_left
+from collections import Counter
+from itertools import count, islice
+
+import tablestore
+
+from .dbapi2 import Connection
+
+
+class _Bound:
+    """Stands for INF_MIN or INF_MAX when comparing primary keys."""
+
+    def __init__(self, sign: int):
+        self.sign = sign
+
+    def __lt__(self, other):
+        return self.sign < 0
+
+    def __gt__(self, other):
+        return self.sign > 0
+
+    def __eq__(self, other):
+        return self is other
+
+
+_MIN = _Bound(-1)
+_MAX = _Bound(1)
+
+
+def _bound_key(primary_key) -> tuple:
+    return tuple(
+        _MIN if value is tablestore.INF_MIN else _MAX if value is tablestore.INF_MAX else value
+        for _, value, *_ in primary_key
+    )
+
+
+def _condition_error(message: str) -> tablestore.OTSServiceError:
+    return tablestore.OTSServiceError(403, "OTSConditionCheckFail", message)
+
+
+class FakeTable:
+    def __init__(self, table_meta: tablestore.TableMeta):
+        self.table_meta = table_meta
+        self.primary_key_names = [name for name, *_ in table_meta.schema_of_primary_key]
+        self.rows = {}
+        self.indexes = {}
+        self.auto_increment = count(1)
+        self._sorted_keys = None
+
+    def sorted_keys(self) -> list:
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self.rows)
+        return self._sorted_keys
+
+    def set(self, key: tuple, attributes: dict):
+        if key not in self.rows:
+            self._sorted_keys = None
+        self.rows[key] = attributes
+
+    def unset(self, key: tuple):
+        if self.rows.pop(key, None) is not None:
+            self._sorted_keys = None
+
+    def key_of(self, primary_key) -> tuple:
+        return tuple(value for _, value, *_ in primary_key)
+
+    def row(self, key: tuple, columns_to_get=None) -> tablestore.Row:
+        attributes = self.rows[key]
+        if columns_to_get:
+            attributes = {name: value for name, value in attributes.items() if name in columns_to_get}
+        return tablestore.Row(
+            list(zip(self.primary_key_names, key)),
+            [(name, value, 0) for name, value in attributes.items()],
+        )
+
+    def write(self, key: tuple, attributes):
+        """Store or remove (``attributes`` is None) a row, maintaining the indexes."""
+        old_attributes = self.rows.get(key)
+        for column, index in self.indexes.items():
+            if old_attributes is not None and column in old_attributes:
+                index.unset((old_attributes[column], *key))
+            if attributes is not None and column in attributes:
+                index.set((attributes[column], *key), attributes)
+
+        if attributes is None:
+            self.unset(key)
+        else:
+            self.set(key, attributes)
+
+    def range(self, start_key: tuple, end_key: tuple):
+        keys = self.sorted_keys()
+        for key in islice(keys, bisect_left(keys, start_key), None):
+            if not key < end_key:
+                break
+            yield key
+
+
+class FakeTablestore:
+    """
+    In-memory Tablestore instance.
+
+    ``latency`` seconds are slept on every request, ``page_size`` caps the rows
+    of a GetRange page, and ``requests`` counts requests by API name.
+    """
+
+    batch_get_row_limit = 100
+    batch_write_row_limit = 200
+
+    def __init__(self, latency: float = 0.0, page_size: int = 5000):
+        self.latency = latency
+        self.page_size = page_size
+        self.tables = {}
+        self.requests = Counter()
+
+    def connect(self, write_behind=False) -> "FakeConnection":
+        return FakeConnection(self, write_behind)
+
+    def create_table(self, table_name: str, defined_columns=()):
+        """Create a table like ``CREATE TABLE`` does, with ``(name, type)`` defined columns."""
+        primary_keys = [("_partition", "INTEGER"), ("id", "INTEGER", tablestore.PK_AUTO_INCR)]
+        self.tables[table_name] = FakeTable(tablestore.TableMeta(table_name, primary_keys, list(defined_columns)))
+
+    def create_index(self, table_name: str, column: str):
+        """Maintain ``ix_<table>_<column>`` like a global secondary index."""
+        table = self.tables[table_name]
+        index_meta = tablestore.TableMeta(
+            f"ix_{table_name}_{column}",
+            [(column, "STRING")] + [(name, "INTEGER") for name in table.primary_key_names],
+        )
+        index = self.tables[index_meta.table_name] = FakeTable(index_meta)
+        table.indexes[column] = index
+        for key, attributes in table.rows.items():
+            if column in attributes:
+                index.set((attributes[column], *key), attributes)
+
+    def load(self, table_name: str, rows):
+        """Insert ``(id, attributes)`` pairs directly, bypassing requests."""
+        table = self.tables[table_name]
+        for pk, attributes in rows:
+            table.write((0, pk), dict(attributes))
+        table.auto_increment = count(max((key[-1] for key in table.rows), default=0) + 1)
+
+    def request(self, api_name: str, *args):
+        self.requests[api_name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        handler = getattr(self, f"_{api_name}", None)
+        if handler is None:
+            raise tablestore.OTSServiceError(400, "OTSUnsupportOperation", f"{api_name} is not supported.")
+        return handler(*args)
+
+    def _table(self, table_name: str) -> FakeTable:
+        if table_name not in self.tables:
+            raise tablestore.OTSServiceError(404, "OTSObjectNotExist", "Requested table does not exist.")
+        return self.tables[table_name]
+
+    def _check_condition(self, table: FakeTable, key: tuple, condition):
+        expectation = condition.row_existence_expectation if condition else "IGNORE"
+        if expectation == "EXPECT_EXIST" and key not in table.rows:
+            raise _condition_error("Condition check failed.")
+        if expectation == "EXPECT_NOT_EXIST" and key in table.rows:
+            raise _condition_error("Condition check failed.")
+
+    def _put(self, table: FakeTable, row: tablestore.Row, condition) -> tuple:
+        key = tuple(
+            next(table.auto_increment) if value is tablestore.PK_AUTO_INCR else value
+            for _, value, *_ in row.primary_key
+        )
+        self._check_condition(table, key, condition)
+        table.write(key, {name: value for name, value, *_ in row.attribute_columns or []})
+        return key
+
+    def _update(self, table: FakeTable, row: tablestore.Row, condition) -> tuple:
+        key = table.key_of(row.primary_key)
+        self._check_condition(table, key, condition)
+        attributes = dict(table.rows.get(key, {}))
+        for name, value, *_ in row.attribute_columns.get("PUT", []):
+            attributes[name] = value
+        for name in row.attribute_columns.get("DELETE_ALL", []):
+            attributes.pop(name, None)
+        table.write(key, attributes)
+        return key
+
+    def _delete(self, table: FakeTable, primary_key, condition) -> tuple:
+        key = table.key_of(primary_key)
+        self._check_condition(table, key, condition)
+        if key in table.rows:
+            table.write(key, None)
+        return key
+
+    def _CreateTable(self, table_meta, table_options, reserved_throughput, *args):
+        if table_meta.table_name in self.tables:
+            raise tablestore.OTSServiceError(409, "OTSObjectAlreadyExist", "Requested table already exists.")
+        self.tables[table_meta.table_name] = FakeTable(table_meta)
+
+    def _DeleteTable(self, table_name):
+        self._table(table_name)
+        del self.tables[table_name]
+
+    def _ListTable(self):
+        return tuple(self.tables)
+
+    def _DescribeTable(self, table_name):
+        table = self._table(table_name)
+        return tablestore.DescribeTableResponse(table.table_meta, tablestore.TableOptions(), None)
+
+    def _GetRow(self, table_name, primary_key, columns_to_get, *args):
+        table = self._table(table_name)
+        key = table.key_of(primary_key)
+        if key not in table.rows:
+            return tablestore.CapacityUnit(1, 0), None, None
+        return tablestore.CapacityUnit(1, 0), table.row(key, columns_to_get), None
+
+    def _PutRow(self, table_name, row, condition, return_type, *args):
+        table = self._table(table_name)
+        key = self._put(table, row, condition)
+        return_row = tablestore.Row(list(zip(table.primary_key_names, key)), []) if return_type else None
+        return tablestore.CapacityUnit(0, 1), return_row
+
+    def _UpdateRow(self, table_name, row, condition, *args):
+        self._update(self._table(table_name), row, condition)
+        return tablestore.CapacityUnit(0, 1), None
+
+    def _DeleteRow(self, table_name, primary_key, condition, *args):
+        self._delete(self._table(table_name), primary_key, condition)
+        return tablestore.CapacityUnit(0, 1), None
+
+    def _GetRange(self, table_name, direction, start_primary_key, end_primary_key, columns_to_get, limit, *args):
+        if direction != "FORWARD":
+            raise tablestore.OTSServiceError(400, "OTSParameterInvalid", "Only FORWARD ranges are supported.")
+
+        table = self._table(table_name)
+        page_size = min(limit or self.page_size, self.page_size)
+        keys = list(islice(table.range(_bound_key(start_primary_key), _bound_key(end_primary_key)), page_size + 1))
+        next_primary_key = None
+        if len(keys) > page_size:
+            next_primary_key = list(zip(table.primary_key_names, keys.pop()))
+
+        row_list = [table.row(key, columns_to_get) for key in keys]
+        return tablestore.CapacityUnit(max(len(row_list), 1), 0), next_primary_key, row_list, None
+
+    def _BatchGetRow(self, request):
+        if sum(len(item.primary_keys) for item in request.items.values()) > self.batch_get_row_limit:
+            raise tablestore.OTSServiceError(400, "OTSParameterInvalid", "Rows count exceeds the upper limit.")
+
+        result = {}
+        for table_name, item in request.items.items():
+            table = self._table(table_name)
+            result[table_name] = []
+            for primary_key in item.primary_keys:
+                key = table.key_of(primary_key)
+                row = table.row(key, item.columns_to_get) if key in table.rows else None
+                result[table_name].append(
+                    tablestore.RowDataItem(
+                        True,
+                        None,
+                        None,
+                        table_name,
+                        tablestore.CapacityUnit(1, 0),
+                        row.primary_key if row else None,
+                        row.attribute_columns if row else None,
+                    )
+                )
+        return result
+
+    def _BatchWriteRow(self, request):
+        if sum(len(item.row_items) for item in request.items.values()) > self.batch_write_row_limit:
+            raise tablestore.OTSServiceError(400, "OTSParameterInvalid", "Rows count exceeds the upper limit.")
+
+        write = {"put": self._put, "update": self._update, "delete": self._delete}
+        result = {}
+        for table_name, item in request.items.items():
+            table = self._table(table_name)
+            result[table_name] = []
+            for row_item in item.row_items:
+                row = row_item.row.primary_key if row_item.type == "delete" else row_item.row
+                try:
+                    key = write[row_item.type](table, row, row_item.condition)
+                    response_item = tablestore.BatchWriteRowResponseItem(
+                        True, None, None, tablestore.CapacityUnit(0, 1), list(zip(table.primary_key_names, key))
+                    )
+                except tablestore.OTSServiceError as e:
+                    response_item = tablestore.BatchWriteRowResponseItem(False, e.code, e.message, None, None)
+                result[table_name].append(response_item)
+        return result
+
+
+class FakeOTSClient(tablestore.OTSClient):
+    """OTSClient whose requests are served by ``self.service`` instead of the network."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def _request_helper(self, api_name, *args, **kwargs):
+        return self.service.request(api_name, *args)
+
+
+class FakeConnection(Connection, FakeOTSClient):
+    def __init__(self, service: FakeTablestore, write_behind=False):
+        self.service = service
+        super().__init__("fake.tablestore", None, None, "fake", write_behind)
@@ -3,11 +3,16 @@ import re
 import sqlparse
 
 
+def explain(conn: tablestore.OTSClient, sql: str, params) -> dict:
+    return {"access_path": "create_table"}
+
+
 def execute(conn: tablestore.OTSClient, sql: str, params):
     create_match = re.match(r'\s*CREATE TABLE "([^ ]*)" ([^;]*)', sql)
     if not create_match:
         raise ValueError(sql)
 
+    conn.stats.access_path = explain(conn, sql, params)["access_path"]
     table_name = create_match.groups()[0]
     schema = create_match.groups()[1]
     primary_keys = [("_partition", "INTEGER"), ("id", "INTEGER", tablestore.PK_AUTO_INCR)]
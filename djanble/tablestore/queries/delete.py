@@ -2,14 +2,23 @@ import tablestore
 import re
 
 
+def explain(conn: tablestore.OTSClient, sql: str, params) -> dict:
+    return {"access_path": "write_buffer" if conn.buffering else "delete_row"}
+
+
 def execute(conn: tablestore.OTSClient, sql: str, params):
     delete_regexp = r'\s*DELETE\s+FROM\s+"(?P<table>\S+?)"\s+WHERE\s+".*?"\."id"\s+(?:=\s*%s|IN\s+\(%s(,\s*%s)*\))\s*$'
     delete_match = re.match(delete_regexp, sql)
     if not delete_match:
         raise ValueError(sql)
 
+    conn.stats.access_path = explain(conn, sql, params)["access_path"]
     table_name = delete_match.groupdict()["table"]
     for param in params:
+        if conn.buffering:
+            conn.write_buffer.delete(table_name, param)
+            continue
+
         primary_keys = [("_partition", 0), ("id", param)]
         consumed, return_row = conn.delete_row(
             table_name, tablestore.Row(primary_keys), tablestore.Condition("EXPECT_EXIST")
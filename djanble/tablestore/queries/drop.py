@@ -2,10 +2,15 @@ import tablestore
 import re
 
 
+def explain(conn: tablestore.OTSClient, sql: str, params) -> dict:
+    return {"access_path": "delete_table"}
+
+
 def execute(conn: tablestore.OTSClient, sql: str, params):
     drop_match = re.match(r'\s*DROP TABLE "([^ ]*)"', sql)
     if not drop_match:
         raise ValueError(sql)
 
+    conn.stats.access_path = explain(conn, sql, params)["access_path"]
     table_name = drop_match.groups()[0]
     conn.delete_table(table_name)
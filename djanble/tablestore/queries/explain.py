@@ -0,0 +1,18 @@
+import importlib
+import re
+
+import tablestore
+
+
+def execute(conn: tablestore.OTSClient, sql: str, params):
+    explained_sql = re.sub(r"^\s*EXPLAIN\s+", "", sql, flags=re.IGNORECASE)
+    statement = explained_sql.split()[0].lower()
+    try:
+        module = importlib.import_module(f".{statement}", package=__package__)
+    except ModuleNotFoundError:
+        raise ValueError(f"Statement {statement} not supported.")
+
+    conn.stats.access_path = "explain"
+    plan = module.explain(conn, explained_sql, params)
+    result = [(key, str(value)) for key, value in plan.items()]
+    return {"rowcount": len(result), "result": iter(result)}
@@ -1,7 +1,6 @@
 import logging
 import re
 from itertools import chain
-from typing import List
 
 import tablestore
 from django.utils.dateparse import parse_datetime
@@ -23,6 +22,25 @@ def row_as_dict(row: tablestore.Row) -> dict:
     return row_dict
 
 
+def iter_range(conn: tablestore.OTSClient, table_name: str, start_primary_key, end_primary_key, columns_to_get=None):
+    """Yield rows of a forward range, following pagination."""
+    primary_key = start_primary_key
+    while primary_key:
+        consumed, primary_key, row_list, _ = conn.get_range(
+            table_name,
+            "FORWARD",
+            primary_key,
+            end_primary_key,
+            columns_to_get,
+        )
+        yield from row_list
+
+
+def referenced_tables(sql: str) -> list:
+    # Subqueries may reference the same table more than once
+    return list(dict.fromkeys(re.findall('(?:FROM|JOIN) "([^ ]*)"', sql, re.IGNORECASE)))
+
+
 def run_any_select(conn: tablestore.OTSClient, sql: str, params) -> list:
     import sqlite3
 
@@ -41,8 +59,7 @@ def run_any_select(conn: tablestore.OTSClient, sql: str, params) -> list:
         "BINARY": "blob",
     }
 
-    table_names = re.findall('(?:FROM|JOIN) "([^ ]*)"', sql, re.IGNORECASE)
-    for table_name in table_names:
+    for table_name in referenced_tables(sql):
         # Create table in sqlite
         table_meta = conn.describe_table(table_name).table_meta
         columns = list(chain(table_meta.schema_of_primary_key, table_meta.defined_columns))
@@ -51,25 +68,23 @@ def run_any_select(conn: tablestore.OTSClient, sql: str, params) -> list:
         )
         cursor.execute(f"CREATE TABLE {table_name}({column_tokens})")
 
-        primary_key = [("_partition", 0), ("id", tablestore.INF_MIN)]
-        rows: List[tablestore.Row] = []
-        while primary_key:
-            consumed, primary_key, row_list, _ = conn.get_range(
-                table_name,
-                "FORWARD",
-                primary_key,
-                [("_partition", 0), ("id", tablestore.INF_MAX)],
-            )
-            rows.extend(row_list)
+        rows = iter_range(
+            conn,
+            table_name,
+            [("_partition", 0), ("id", tablestore.INF_MIN)],
+            [("_partition", 0), ("id", tablestore.INF_MAX)],
+        )
 
         placeholder_tokens = ", ".join(["?"] * len(columns))
-        for row in rows:
-            row_dict = row_as_dict(row)
-            row_values = [row_dict.get(column_name, None) for column_name, *_ in columns]
-            cursor.execute(f'INSERT INTO "{table_name}" VALUES ({placeholder_tokens})', row_values)
+        with conn.stats.measure_decode():
+            for row in rows:
+                row_dict = row_as_dict(row)
+                row_values = [row_dict.get(column_name, None) for column_name, *_ in columns]
+                cursor.execute(f'INSERT INTO "{table_name}" VALUES ({placeholder_tokens})', row_values)
 
-    cursor.execute(sql.replace("%s", "?"), params)
-    return cursor.fetchall()
+    with conn.stats.measure_decode():
+        cursor.execute(sql.replace("%s", "?"), params)
+        return cursor.fetchall()
 
 
 def parse_select(sql: str):
@@ -98,22 +113,47 @@ def parse_select(sql: str):
     return groupdict
 
 
+def plan_select(parsed_sql: dict, params) -> dict:
+    table_name = parsed_sql["table"]
+    condition_column = parsed_sql.get("condition_column")
+    if condition_column == "id" and len(params) == 1:
+        return {"access_path": "get_row", "table": table_name}
+    elif condition_column == "id" and len(params) > 1:
+        return {"access_path": "batch_get_row", "table": table_name}
+    elif condition_column:
+        return {"access_path": "index_range", "table": f"ix_{table_name}_{condition_column}"}
+    else:
+        return {"access_path": "full_range", "table": table_name}
+
+
+def explain(conn: tablestore.OTSClient, sql: str, params) -> dict:
+    try:
+        parsed_sql = parse_select(sql)
+    except NotSupportedError:
+        return {"access_path": "sqlite_fallback", "table": ", ".join(referenced_tables(sql))}
+
+    return plan_select(parsed_sql, params)
+
+
 def execute(conn: tablestore.OTSClient, sql: str, params):
     try:
         parsed_sql = parse_select(sql)
 
     except NotSupportedError:
+        conn.stats.access_path = "sqlite_fallback"
         result = run_any_select(conn, sql, params)
         return {"rowcount": len(result), "result": iter(result)}
 
+    plan = plan_select(parsed_sql, params)
+    conn.stats.access_path = plan["access_path"]
     table_name = parsed_sql["table"]
     condition_column = parsed_sql.get("condition_column")
     columns = [re.sub(".*\\.", "", column)[1:-1] for column in parsed_sql["columns"]]
-    if condition_column == "id" and len(params) == 1:
+    if plan["access_path"] == "get_row":
         # Get row by id
         _, row, _ = conn.get_row(table_name, [("_partition", 0), ("id", params[0])])
         row_list = [row] if row else []
-    elif condition_column == "id" and len(params) > 1:
+    elif plan["access_path"] == "batch_get_row":
         # Batch get row by id
         request = tablestore.BatchGetRowRequest()
         request.add(
@@ -125,30 +165,35 @@ def execute(conn: tablestore.OTSClient, sql: str, params):
         response = conn.batch_get_row(request)
         table_result = response.get_result_by_table(table_name)
         row_list = [item.row for item in table_result if item.is_ok and item.row]
-    elif condition_column:
+    elif plan["access_path"] == "index_range":
         # Find from index table
-        consumed, next_primary_key, row_list, _ = conn.get_range(
-            f"ix_{table_name}_{condition_column}",
-            "FORWARD",
-            [(condition_column, params[0]), ("_partition", 0), ("id", tablestore.INF_MIN)],
-            [(condition_column, params[0]), ("_partition", 0), ("id", tablestore.INF_MAX)],
+        row_list = list(
+            iter_range(
+                conn,
+                plan["table"],
+                [(condition_column, params[0]), ("_partition", 0), ("id", tablestore.INF_MIN)],
+                [(condition_column, params[0]), ("_partition", 0), ("id", tablestore.INF_MAX)],
+            )
         )
     else:
         # Get all from main table
-        consumed, next_primary_key, row_list, _ = conn.get_range(
-            table_name,
-            "FORWARD",
-            [("_partition", 0), ("id", tablestore.INF_MIN)],
-            [("_partition", 0), ("id", tablestore.INF_MAX)],
+        row_list = list(
+            iter_range(
+                conn,
+                table_name,
+                [("_partition", 0), ("id", tablestore.INF_MIN)],
+                [("_partition", 0), ("id", tablestore.INF_MAX)],
+            )
         )
 
-    row_dicts = [row_as_dict(row) for row in row_list]
-    if parsed_sql["order_column"]:
-        order_column = re.sub(".*\\.", "", parsed_sql["order_column"])[1:-1]
-        row_dicts.sort(
-            key=lambda row: row.get(order_column, None),
-            reverse=parsed_sql["order_direction"] == "DESC",
-        )
-    result = [[row.get(column, None) for column in columns] for row in row_dicts]
+    with conn.stats.measure_decode():
+        row_dicts = [row_as_dict(row) for row in row_list]
+        if parsed_sql["order_column"]:
+            order_column = re.sub(".*\\.", "", parsed_sql["order_column"])[1:-1]
+            row_dicts.sort(
+                key=lambda row: row.get(order_column, None),
+                reverse=parsed_sql["order_direction"] == "DESC",
+            )
+        result = [[row.get(column, None) for column in columns] for row in row_dicts]
 
     return {"rowcount": len(result), "result": iter(result)}
@@ -1,26 +1,138 @@
 import re
+
 import tablestore
 
+from ..transaction import update_columns
+from .select import iter_range, run_any_select
+
+UPDATE_REGEXP = re.compile(
+    r'\s*UPDATE\s+"(?P<table>[^"]+)"\s+SET\s+(?P<assignments>.+?)(?:\s+WHERE\s+(?P<condition>.+?))?\s*;?\s*$', re.S
+)
+ASSIGNMENT_REGEXP = re.compile(r'\s*"(?P<column>[^"]+)"\s*=\s*(?P<value>%s|NULL|CASE\s.*?\sEND)\s*(?:,|$)', re.S)
+CASE_REGEXP = re.compile(
+    r"CASE\s+(?P<whens>(?:WHEN\s.+?\sTHEN\s+(?:%s|NULL)\s+)+)ELSE\s+(?P<default>%s|NULL)\s+END", re.S
+)
+WHEN_REGEXP = re.compile(r'WHEN\s+\(?"[^"]+"\."id"\s*=\s*%s\)?\s+THEN\s+(%s|NULL)')
+
+
+def parse_assignments(segment: str, params_iter):
+    """
+    Split the SET clause into constant assignments and per-row assignments.
+    The latter come from the ``CASE WHEN "t"."id" = %s THEN %s ... END`` form
+    emitted by ``bulk_update`` and map each column to ``(values_by_id, default)``.
+    """
+    assignments = {}
+    case_assignments = {}
+    position = 0
+    while position < len(segment):
+        assignment_match = ASSIGNMENT_REGEXP.match(segment, position)
+        if not assignment_match:
+            raise ValueError(segment)
+        position = assignment_match.end()
+
+        column, value = assignment_match.group("column", "value")
+        if value == "%s":
+            assignments[column] = next(params_iter)
+        elif value == "NULL":
+            assignments[column] = None
+        else:
+            case_match = CASE_REGEXP.fullmatch(value)
+            whens = WHEN_REGEXP.findall(value)
+            if not case_match or len(whens) != value.count("WHEN"):
+                raise ValueError(value)
+            cases = {}
+            for then in whens:
+                pk = next(params_iter)
+                cases[pk] = next(params_iter) if then == "%s" else None
+            default = next(params_iter) if case_match.group("default") == "%s" else None
+            case_assignments[column] = (cases, default)
+
+    return assignments, case_assignments
+
+
+def plan_target_keys(condition) -> str:
+    """Choose how the ids of rows matched by the WHERE clause of an UPDATE are found."""
+    if not condition:
+        return "full_range"
+    elif re.fullmatch(r'"[^"]+"\."id"\s+(?:=\s*%s|IN\s+\(%s(?:,\s*%s)*\))', condition):
+        return "ids"
+    elif re.fullmatch(r'"[^"]+"\."[^"]+"\s+=\s+%s', condition):
+        return "index_range"
+    else:
+        return "sqlite_fallback"
+
+
+def iter_target_keys(conn: tablestore.OTSClient, table_name: str, condition, params):
+    """Yield the ids of rows matched by the WHERE clause of an UPDATE."""
+    key_source = plan_target_keys(condition)
+    if key_source == "ids":
+        yield from params
+        return
+
+    if key_source == "index_range":
+        # Find from index table
+        column = re.fullmatch(r'"[^"]+"\."(?P<column>[^"]+)".*', condition).group("column")
+        start_primary_key = [(column, params[0]), ("_partition", 0), ("id", tablestore.INF_MIN)]
+        end_primary_key = [(column, params[0]), ("_partition", 0), ("id", tablestore.INF_MAX)]
+        table_name = f"ix_{table_name}_{column}"
+    elif key_source == "full_range":
+        # Update all rows of main table
+        start_primary_key = [("_partition", 0), ("id", tablestore.INF_MIN)]
+        end_primary_key = [("_partition", 0), ("id", tablestore.INF_MAX)]
+    else:
+        for (pk,) in run_any_select(conn, f'SELECT "{table_name}"."id" FROM "{table_name}" WHERE {condition}', params):
+            yield pk
+        return
+
+    for row in iter_range(conn, table_name, start_primary_key, end_primary_key, ["id"]):
+        yield dict(row.primary_key)["id"]
+
+
+def explain(conn: tablestore.OTSClient, sql: str, params) -> dict:
+    update_match = UPDATE_REGEXP.match(sql)
+    if not update_match:
+        raise ValueError(sql)
+
+    key_source = plan_target_keys(update_match.group("condition"))
+    write_path = "write_buffer" if conn.buffering else "batch_write_row"
+    access_path = write_path if key_source == "ids" else f"{key_source} -> {write_path}"
+    return {"access_path": access_path, "table": update_match.group("table")}
+
 
 def execute(conn: tablestore.OTSClient, sql: str, params):
     if hasattr(params, "__iter__"):
         params = tuple(bytearray(param) if isinstance(param, memoryview) else param for param in params)
 
-    update_match = re.match('UPDATE "([^ ]*)" SET ((?:"(?:[^"]*)" = (?:%s|NULL),? )+)WHERE ".*"\\."id" = %s$', sql)
+    update_match = UPDATE_REGEXP.match(sql)
     if not update_match:
         raise ValueError(sql)
+    conn.stats.access_path = explain(conn, sql, params)["access_path"]
 
+    table_name, segment, condition = update_match.group("table", "assignments", "condition")
     params_iter = iter(params)
+    assignments, case_assignments = parse_assignments(segment, params_iter)
+    where_params = list(params_iter)
 
-    assignments = {}
-    for assignment_expr in update_match.groups()[1].split(","):
-        lhs, rhs = assignment_expr.strip().split(" = ")
-        if rhs == "%s":
-            assignments[lhs.strip('"')] = next(params_iter)
+    def row_assignments(pk) -> dict:
+        return {
+            **assignments,
+            **{column: cases.get(pk, default) for column, (cases, default) in case_assignments.items()},
+        }
+
+    if conn.write_buffer and plan_target_keys(condition) != "ids":
+        # The key scan must see the writes buffered so far
+        conn.flush()
+
+    target_keys = iter_target_keys(conn, table_name, condition, where_params)
+    if conn.buffering:
+        rowcount = 0
+        for pk in target_keys:
+            rowcount += conn.write_buffer.update(table_name, pk, row_assignments(pk))
+        return {"rowcount": rowcount}
 
-    table_name = update_match.groups()[0]
-    primary_keys = [("_partition", 0), ("id", params[-1])]
-    row = tablestore.Row(primary_keys, {"PUT": list(assignments.items())})
-    conn.update_row(table_name, row, tablestore.Condition("EXPECT_EXIST"))
+    def row_items():
+        for pk in target_keys:
+            row = tablestore.Row([("_partition", 0), ("id", pk)], update_columns(row_assignments(pk)))
+            yield table_name, tablestore.UpdateRowItem(row, tablestore.Condition("EXPECT_EXIST"))
 
-    return {"rowcount": 1}
+    return {"rowcount": conn.batch_write(row_items())}
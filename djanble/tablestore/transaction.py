@@ -0,0 +1,54 @@
+import tablestore
+
+
+def update_columns(assignments: dict) -> dict:
+    """Attribute columns of an UpdateRow; columns assigned NULL are deleted."""
+    columns = {
+        "PUT": [(column, value) for column, value in assignments.items() if value is not None],
+        "DELETE_ALL": [column for column, value in assignments.items() if value is None],
+    }
+    return {action: items for action, items in columns.items() if items}
+
+
+class WriteBuffer:
+    """
+    Row writes deferred until the surrounding transaction commits.
+
+    Writes are keyed by table and primary key, so repeated updates of the same
+    row collapse into a single update item. An update of a row whose delete is
+    buffered matches nothing, as it would once the delete had been sent.
+    """
+
+    def __init__(self):
+        self.rows = {}
+
+    def __bool__(self):
+        return bool(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def update(self, table_name: str, pk, assignments: dict) -> bool:
+        """Buffer an update of a row; returns False if the row is already deleted."""
+        action, pending = self.rows.get((table_name, pk), ("update", {}))
+        if action == "delete":
+            return False
+        self.rows[(table_name, pk)] = ("update", {**pending, **assignments})
+        return True
+
+    def delete(self, table_name: str, pk):
+        self.rows[(table_name, pk)] = ("delete", None)
+
+    def clear(self):
+        self.rows.clear()
+
+    def row_items(self):
+        """Yield ``(table_name, row_item)`` pairs for ``BatchWriteRow``."""
+        for (table_name, pk), (action, assignments) in self.rows.items():
+            primary_keys = [("_partition", 0), ("id", pk)]
+            condition = tablestore.Condition("EXPECT_EXIST")
+            if action == "update":
+                row = tablestore.Row(primary_keys, update_columns(assignments))
+                yield table_name, tablestore.UpdateRowItem(row, condition)
+            else:
+                yield table_name, tablestore.DeleteRowItem(tablestore.Row(primary_keys), condition)
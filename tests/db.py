@@ -1,11 +1,15 @@
-import environ
+import pytest
 
-from djanble.base import DatabaseWrapper
+environ = pytest.importorskip("environ")
+
+from djanble.tablestore.connector.django.base import DatabaseWrapper
 
 
 def get_default_connection() -> DatabaseWrapper:
     env = environ.Env()
     environ.Env.read_env()
+    if not env.str("DATABASE_URL", default=""):
+        pytest.skip("DATABASE_URL is not set", allow_module_level=True)
     connection = DatabaseWrapper(env.db("DATABASE_URL"))
     connection_params = connection.get_connection_params()
     connection.get_new_connection(connection_params)
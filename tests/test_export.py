@@ -0,0 +1,96 @@
+import array
+import io
+
+import pytest
+
+from djanble.export import Chunk, ColumnBuffers, column_array, column_kind, write_csv, write_parquet
+from djanble.tablestore.fake import FakeTablestore
+
+
+def test_column_array():
+    assert column_array([1, 2], "int") == array.array("q", [1, 2])
+    assert column_array([1, 2.5], "float") == array.array("d", [1, 2.5])
+    assert column_array([1, None], "int") == array.array("q", [1, 0])
+    assert column_array([True, None], "object") == [True, None]
+    with pytest.raises(TypeError):
+        column_array([1.5], "int")
+
+
+def test_column_kind():
+    assert column_kind([None, 1]) == "int"
+    assert column_kind([1, 2.5]) == "float"
+    assert column_kind([None]) == "object"
+    assert column_kind([None], "int") == "int"
+    assert column_kind([2], "float") == "float"
+    assert column_kind([2.5], "int") == "float"
+    assert column_kind(["x", 1], "int") == "object"
+    assert column_kind([1], "object") == "object"
+
+
+def test_column_buffers_chunks():
+    buffers = ColumnBuffers(["id", "title"], chunk_size=2)
+    offset = buffers.grow(3)
+    buffers.columns["id"][offset:] = [1, 2, 3]
+    buffers.columns["title"][offset + 1] = "B"
+    assert list(buffers.chunks()) == [{"id": array.array("q", [1, 2]), "title": [None, "B"]}]
+    assert list(buffers.chunks(final=True)) == [{"id": array.array("q", [3]), "title": [None]}]
+
+    f = io.StringIO()
+    chunk = Chunk({"id": array.array("q", [1, 0]), "title": [None, "B"]}, {"id": "int", "title": "object"}, {"id": [1]})
+    write_csv(f, ["id", "title"], [chunk])
+    assert f.getvalue().splitlines() == ["id,title", "1,", ",B"]
+
+
+def export_service() -> FakeTablestore:
+    service = FakeTablestore(page_size=2)
+    service.create_table("oj_problem", [("score", "DOUBLE")])
+    service.load("oj_problem", [(1, {}), (2, {}), (3, {"score": 1.5, "rank": 1}), (4, {"rank": 2.5}), (5, {})])
+    return service
+
+
+def test_export_column_types_are_kept_across_chunks():
+    conn = export_service().connect()
+    chunks = list(conn.export("oj_problem", ["id", "score", "rank"], chunk_size=2))
+
+    assert [chunk["id"] for chunk in chunks] == [
+        array.array("q", [1, 2]),
+        array.array("q", [3, 4]),
+        array.array("q", [5]),
+    ]
+    assert all(type(chunk["score"]) is array.array and chunk["score"].typecode == "d" for chunk in chunks)
+    assert [chunk.nulls.get("score") for chunk in chunks] == [[0, 1], [1], [0]]
+    assert chunks[1].with_nulls("score") == [1.5, None]
+    # Without a schema type, "rank" takes the kind of its first chunk, which has no values
+    assert [chunk["rank"] for chunk in chunks] == [[None, None], [1, 2.5], [None]]
+
+    f = io.StringIO()
+    write_csv(f, ["id", "score"], conn.export("oj_problem", ["id", "score"], chunk_size=2))
+    assert f.getvalue().splitlines() == ["id,score", "1,", "2,", "3,1.5", "4,", "5,"]
+
+
+def test_export_widens_column_types(tmp_path):
+    service = FakeTablestore(page_size=2)
+    service.create_table("oj_problem")
+    service.load("oj_problem", [(1, {"rank": 1}), (2, {"rank": 2}), (3, {"rank": 2.5}), (4, {}), (5, {"rank": "x"})])
+    chunks = list(service.connect().export("oj_problem", ["rank"], chunk_size=2))
+
+    assert [chunk.kinds["rank"] for chunk in chunks] == ["int", "float", "object"]
+    assert chunks[0]["rank"] == array.array("q", [1, 2])
+    assert chunks[1].with_nulls("rank") == [2.5, None]
+    assert chunks[2]["rank"] == ["x"]
+
+    pytest.importorskip("pyarrow.parquet")
+    with pytest.raises(TypeError):
+        # Row groups written as int64 cannot hold the widened values
+        write_parquet(tmp_path / "oj_problem.parquet", ["rank"], chunks)
+
+    parquet = pytest.importorskip("pyarrow.parquet")
+    conn = export_service().connect()
+    path = tmp_path / "oj_problem.parquet"
+    write_parquet(path, ["id", "score", "rank"], conn.export("oj_problem", ["id", "score", "rank"], chunk_size=2))
+
+    assert parquet.read_table(path).to_pydict() == {
+        "id": [1, 2, 3, 4, 5],
+        "score": [None, None, 1.5, None, None],
+        "rank": [None, None, "1", "2.5", None],
+    }
@@ -0,0 +1,51 @@
+import pytest
+from botocore.exceptions import ClientError
+
+from djanble.dynamodb.fake import FakeDynamoDB
+from djanble.tablestore.fake import FakeTablestore
+
+
+def test_fake_tablestore_pages():
+    service = FakeTablestore(page_size=2)
+    service.create_table("oj_problem")
+    service.create_index("oj_problem", "title")
+    service.load("oj_problem", [(1, {"title": "A"}), (2, {"title": "B"}), (3, {"title": "A"}), (4, {"title": "A"})])
+    cursor = service.connect().cursor()
+
+    cursor.execute('UPDATE "oj_problem" SET "title" = %s WHERE "oj_problem"."title" = %s', ["C", "A"])
+    assert cursor.rowcount == 3
+    assert service.requests == {"GetRange": 2, "BatchWriteRow": 1}
+
+    cursor.execute('SELECT "oj_problem"."id" FROM "oj_problem" WHERE "oj_problem"."title" = %s', ["C"])
+    assert cursor.fetchmany(4) == [[1], [3], [4]]
+    assert service.requests["GetRange"] == 4
+
+
+def test_fake_dynamodb_transaction_rollback():
+    service = FakeDynamoDB()
+    service.create_table("oj_problem")
+    service.load("oj_problem", [(1, {"title": "A"})])
+    conn = service.connect()
+
+    with pytest.raises(ClientError) as e:
+        conn.client.execute_transaction(
+            TransactStatements=[
+                {"Statement": """UPDATE "oj_problem" SET "title" = 'B' WHERE "_pid" = 0 AND "id" = 1"""},
+                {"Statement": """UPDATE "oj_problem" SET "title" = 'B' WHERE "_pid" = 0 AND "id" = 2"""},
+            ]
+        )
+    assert e.value.response["Error"]["Code"] == "TransactionCanceledException"
+
+    items = conn.client.execute_statement(Statement='SELECT "title" FROM "oj_problem" WHERE "_pid" = 0 AND "id" = 1')
+    assert items["Items"] == [{"title": {"S": "A"}}]
+
+
+def test_fake_dynamodb_export():
+    service = FakeDynamoDB(page_size=2)
+    service.create_table("oj_problem")
+    service.load("oj_problem", [(pk, {"title": f"P{pk}"}) for pk in range(1, 6)])
+    chunks = list(service.connect().export("oj_problem", ["id", "title"], chunk_size=4))
+
+    assert [list(chunk["id"]) for chunk in chunks] == [[1, 2, 3, 4], [5]]
+    assert chunks[1]["title"] == ["P5"]
+    assert service.requests == {"ExecuteStatement": 3}
@@ -0,0 +1,40 @@
+from djanble import instrumentation
+from djanble.instrumentation import QueryStats
+from djanble.tablestore.fake import FakeTablestore
+
+
+def test_query_stats():
+    records = []
+    hook = instrumentation.register(records.append)
+    try:
+        stats = QueryStats('SELECT "oj_problem"."id" FROM "oj_problem" WHERE "oj_problem"."id" IN (%s, %s,  %s)')
+        stats.add_request(0.5, read_capacity=2, rows_scanned=3, page=True)
+        stats.add_request(0.25, write_capacity=1)
+        stats.finish()
+    finally:
+        instrumentation.unregister(hook)
+
+    assert records == [stats]
+    record = stats.as_dict()
+    assert record["shape"] == 'SELECT "oj_problem"."id" FROM "oj_problem" WHERE "oj_problem"."id" IN (%s, ...)'
+    assert record["network_time"] == "0.750"
+    assert (stats.requests, stats.pages, stats.rows_scanned) == (2, 1, 3)
+    assert (stats.read_capacity, stats.write_capacity) == (2, 1)
+
+
+def test_batch_write_stats_from_worker_threads():
+    service = FakeTablestore()
+    service.create_table("oj_problem")
+    service.load("oj_problem", [(pk, {"title": "A"}) for pk in range(1, 1001)])
+    records = []
+    hook = instrumentation.register(records.append)
+    try:
+        cursor = service.connect().cursor()
+        cursor.execute('UPDATE "oj_problem" SET "title" = %s', ["B"])
+    finally:
+        instrumentation.unregister(hook)
+
+    assert cursor.rowcount == 1000
+    (stats,) = records
+    assert stats.requests == sum(service.requests.values())
+    assert stats.write_capacity == 1000
@@ -1,4 +1,5 @@
-from djanble.queries.select import parse_select
+from djanble.dynamodb.fake import FakeDynamoDB
+from djanble.tablestore.queries.select import parse_select
 
 
 def test_parse_select():
@@ -6,3 +7,16 @@ def test_parse_select():
         'SELECT "oj_problem"."id", "oj_problem"."title" FROM "oj_problem" WHERE "oj_problem"."id" = %s ORDER BY "oj_problem"."title" ASC LIMIT 10'
     )
     assert parse_result["table"] == "oj_problem"
+
+
+def test_dynamodb_select_null_column():
+    service = FakeDynamoDB()
+    service.create_table("t")
+    service.load("t", [(1, {"title": "A", "score": 3})])
+    cursor = service.connect().cursor()
+    cursor.execute('INSERT INTO "t" ("title", "score") VALUES (%s, %s)', ["B", None])
+    pk = cursor.lastrowid
+    cursor.execute('UPDATE "t" SET "score" = NULL WHERE "t"."id" = %s', [1])
+
+    cursor.execute('SELECT "t"."id", "t"."title", "t"."score" FROM "t"', ())
+    assert sorted(cursor.fetchmany(2)) == [(1, "A", None), (pk, "B", None)]
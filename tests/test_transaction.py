@@ -0,0 +1,153 @@
+import pytest
+import tablestore
+from botocore.exceptions import ClientError
+from django.conf import settings
+
+from djanble.dynamodb.fake import FakeDynamoDB
+from djanble.dynamodb.queries.update import parse_update
+from djanble.dynamodb.transaction import WriteBuffer
+from djanble.tablestore import transaction
+from djanble.tablestore.connector.django.base import DatabaseWrapper
+from djanble.tablestore.fake import FakeTablestore
+
+
+def test_write_buffer_collapse():
+    buffer = WriteBuffer()
+    buffer.update("oj_problem", 1, {"title": "A", "score": 10})
+    buffer.update("oj_problem", 1, {"title": "B", "note": None})
+    buffer.insert("oj_problem", {"_pid": 0, "id": 2, "title": "C"})
+    buffer.update("oj_problem", 2, {"title": "D"})
+    buffer.insert("oj_problem", {"_pid": 0, "id": 3, "title": "E"})
+    buffer.delete("oj_problem", 3)
+    buffer.delete("oj_problem", 4)
+    assert not buffer.update("oj_problem", 4, {"title": "F"})
+
+    assert list(buffer.statements()) == [
+        """UPDATE "oj_problem" SET "title" = 'B' SET "score" = 10 REMOVE "note" WHERE "_pid" = 0 AND "id" = 1""",
+        """INSERT INTO "oj_problem" VALUE {'_pid': 0, 'id': 2, 'title': 'D'}""",
+        """DELETE FROM "oj_problem" WHERE "_pid" = 0 AND "id" = 4""",
+    ]
+
+
+def test_update_expression_is_not_buffered():
+    service = FakeDynamoDB()
+    service.create_table("oj_problem")
+    service.load("oj_problem", [(1, {"score": 1, "title": "A"})])
+    conn = service.connect(write_behind=True)
+    conn.autocommit = False
+    cursor = conn.cursor()
+
+    assert parse_update('UPDATE "t" SET "a" = %s, "b" = NULL WHERE "t"."id" = %s') == (
+        "t",
+        [("a", "%s"), ("b", "NULL")],
+    )
+    with pytest.raises(ClientError):
+        # F() expressions are sent as PartiQL, which rejects this one, instead of being half parsed
+        cursor.execute(
+            'UPDATE "oj_problem" SET "score" = ("oj_problem"."score" + %s), "title" = %s WHERE "oj_problem"."id" = %s',
+            (1, "B", 1),
+        )
+    assert not conn.write_buffer
+
+
+def test_tablestore_write_buffer_collapse():
+    buffer = transaction.WriteBuffer()
+    buffer.update("oj_problem", 1, {"title": "A", "score": 10})
+    buffer.update("oj_problem", 1, {"title": "B", "note": None})
+    buffer.delete("oj_problem", 2)
+    assert not buffer.update("oj_problem", 2, {"title": "C"})
+    buffer.update("oj_problem", 3, {"title": "D"})
+    buffer.delete("oj_problem", 3)
+
+    row_items = list(buffer.row_items())
+    assert [(table_name, type(item)) for table_name, item in row_items] == [
+        ("oj_problem", tablestore.UpdateRowItem),
+        ("oj_problem", tablestore.DeleteRowItem),
+        ("oj_problem", tablestore.DeleteRowItem),
+    ]
+    assert row_items[0][1].row.attribute_columns == {"PUT": [("title", "B"), ("score", 10)], "DELETE_ALL": ["note"]}
+    assert all(item.condition.row_existence_expectation == "EXPECT_EXIST" for _, item in row_items)
+
+
+def test_tablestore_write_behind_commit_and_rollback():
+    if not settings.configured:
+        settings.configure()
+    service = FakeTablestore()
+    service.create_table("oj_problem")
+    service.load("oj_problem", [(1, {"title": "A"}), (2, {"title": "A"})])
+    wrapper = DatabaseWrapper({"HOST": None, "USER": None, "PASSWORD": None, "NAME": None})
+    wrapper.connection = wrapper.conn = service.connect(write_behind=True)
+    cursor = wrapper.create_cursor()
+    sql = 'UPDATE "oj_problem" SET "title" = %s WHERE "oj_problem"."id" = %s'
+
+    wrapper.set_autocommit(False)
+    cursor.execute(sql, ["B", 1])
+    assert not service.requests
+    wrapper.rollback()
+    assert not wrapper.conn.write_buffer
+
+    cursor.execute(sql, ["C", 2])
+    cursor.execute(sql, ["D", 2])
+    wrapper.commit()
+    assert service.requests == {"BatchWriteRow": 1}
+    assert service.tables["oj_problem"].rows == {(0, 1): {"title": "A"}, (0, 2): {"title": "D"}}
+
+    wrapper.set_autocommit(True)
+    cursor.execute(sql, ["E", 1])
+    assert service.requests == {"BatchWriteRow": 2}
+
+
+def test_tablestore_buffered_update_of_deleted_row():
+    service = FakeTablestore()
+    service.create_table("oj_problem")
+    service.load("oj_problem", [(1, {"a": 1}), (2, {"a": 2})])
+    conn = service.connect(write_behind=True)
+    conn.autocommit = False
+    cursor = conn.cursor()
+
+    cursor.execute('DELETE FROM "oj_problem" WHERE "oj_problem"."id" IN (%s)', [2])
+    cursor.execute('UPDATE "oj_problem" SET "a" = %s WHERE "oj_problem"."id" IN (%s, %s)', [7, 1, 2])
+    assert cursor.rowcount == 1
+    conn.commit()
+    assert service.tables["oj_problem"].rows == {(0, 1): {"a": 7}}
+
+
+def test_tablestore_commit_skips_missing_rows():
+    service = FakeTablestore()
+    service.create_table("oj_problem")
+    service.load("oj_problem", [(1, {"a": 1})])
+    conn = service.connect(write_behind=True)
+    conn.autocommit = False
+    cursor = conn.cursor()
+
+    cursor.execute('UPDATE "oj_problem" SET "a" = %s WHERE "oj_problem"."id" IN (%s, %s)', [7, 1, 999])
+    cursor.execute('DELETE FROM "oj_problem" WHERE "oj_problem"."id" = %s', [998])
+    conn.commit()
+    assert not conn.write_buffer
+    assert service.tables["oj_problem"].rows == {(0, 1): {"a": 7}}
+
+
+def test_insert_leaves_out_null_columns():
+    service = FakeDynamoDB()
+    service.create_table("oj_problem")
+    cursor = service.connect().cursor()
+    cursor.execute('INSERT INTO "oj_problem" ("title", "score") VALUES (%s, %s)', ("It's", None))
+
+    (item,) = service.tables["oj_problem"].items.values()
+    assert item == {"title": "It's", "_pid": 0, "id": cursor.lastrowid}
+
+
+def test_binary_values_are_rejected():
+    service = FakeDynamoDB()
+    service.create_table("oj_problem")
+    service.load("oj_problem", [(1, {"title": "A"})])
+    conn = service.connect(write_behind=True)
+    cursor = conn.cursor()
+
+    with pytest.raises(TypeError):
+        cursor.execute('INSERT INTO "oj_problem" ("data") VALUES (%s)', [b"ab"])
+    conn.autocommit = False
+    with pytest.raises(TypeError):
+        cursor.execute('UPDATE "oj_problem" SET "data" = %s WHERE "oj_problem"."id" = %s', [memoryview(b"ab"), 1])
+    assert not conn.write_buffer
+    assert service.tables["oj_problem"].items == {(0, 1): {"_pid": 0, "id": 1, "title": "A"}}
@@ -0,0 +1,79 @@
+import pytest
+
+from djanble.tablestore import dbapi2
+from djanble.tablestore.fake import FakeTablestore
+from djanble.tablestore.queries.update import parse_assignments, plan_target_keys
+
+
+def test_buffered_writes_are_visible_to_key_scans():
+    service = FakeTablestore()
+    service.create_table("t", [("c", "INTEGER"), ("s", "INTEGER")])
+    service.load("t", [(1, {"c": 1}), (2, {"c": 2})])
+    conn = service.connect(write_behind=True)
+    conn.autocommit = False
+    cursor = conn.cursor()
+
+    cursor.execute('UPDATE "t" SET "c" = %s WHERE "t"."id" = %s', [9, 1])
+    cursor.execute('UPDATE "t" SET "s" = %s WHERE "t"."c" > %s', [5, 8])
+    assert cursor.rowcount == 1
+    conn.commit()
+    assert service.tables["t"].rows[(0, 1)] == {"c": 9, "s": 5}
+
+
+def test_parse_assignments():
+    params = iter(["A", 7, 1])
+    assignments, case_assignments = parse_assignments('"title" = %s, "note" = NULL, "score" = %s', params)
+    assert assignments == {"title": "A", "note": None, "score": 7}
+    assert case_assignments == {}
+    assert list(params) == [1]
+
+    with pytest.raises(ValueError):
+        parse_assignments('"score" = ("t"."score" + %s)', iter([1]))
+
+
+def test_parse_bulk_update_case():
+    segment = (
+        '"title" = CASE WHEN ("t"."id" = %s) THEN %s WHEN ("t"."id" = %s) THEN NULL ELSE NULL END, '
+        '"score" = CASE WHEN ("t"."id" = %s) THEN %s ELSE %s END'
+    )
+    params = iter([1, "A", 2, 1, 10, 0, 1, 2])
+    assignments, case_assignments = parse_assignments(segment, params)
+    assert assignments == {}
+    assert case_assignments == {"title": ({1: "A", 2: None}, None), "score": ({1: 10}, 0)}
+    assert list(params) == [1, 2]
+
+
+def test_plan_target_keys():
+    assert plan_target_keys(None) == "full_range"
+    assert plan_target_keys('"t"."id" IN (%s, %s)') == "ids"
+    assert plan_target_keys('"t"."author_id" = %s') == "index_range"
+    assert plan_target_keys('"t"."score" > %s') == "sqlite_fallback"
+
+
+def test_update_rowcount_skips_missing_rows():
+    service = FakeTablestore()
+    service.create_table("t")
+    service.load("t", [(1, {"title": "A"}), (2, {"title": "B"})])
+    cursor = service.connect().cursor()
+
+    whens = 'CASE WHEN ("t"."id" = %s) THEN %s WHEN ("t"."id" = %s) THEN %s ELSE NULL END'
+    cursor.execute(f'UPDATE "t" SET "title" = {whens} WHERE "t"."id" IN (%s, %s)', [1, "C", 99, "D", 1, 99])
+    assert cursor.rowcount == 1
+    assert service.tables["t"].rows == {(0, 1): {"title": "C"}, (0, 2): {"title": "B"}}
+
+
+def test_batch_write_sends_single_request_inline(monkeypatch):
+    service = FakeTablestore()
+    service.create_table("t")
+    service.load("t", [(pk, {"title": "A"}) for pk in range(1, dbapi2.BATCH_WRITE_ROW_LIMIT + 2)])
+    cursor = service.connect().cursor()
+
+    with monkeypatch.context() as patch:
+        patch.setattr(dbapi2, "ThreadPoolExecutor", None)
+        cursor.execute('UPDATE "t" SET "title" = %s WHERE "t"."id" = %s', ["B", 1])
+    assert cursor.rowcount == 1
+    assert service.requests == {"BatchWriteRow": 1}
+
+    cursor.execute('UPDATE "t" SET "title" = %s', ["C"])
+    assert cursor.rowcount == dbapi2.BATCH_WRITE_ROW_LIMIT + 1
+    assert service.requests["BatchWriteRow"] == 3